@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# 라인별 TTS mp3 병합 벤치마크 + 구간 일치 확인 (네트워크 불필요, pydub 용 ffmpeg/ffprobe 필요)
+#   decoded: 기존 경로 (pydub 디코딩 -> PCM 이어 붙이기 -> mp3 재인코딩)
+#   frames : mp3_frames.concat_mp3 (프레임 헤더로 길이, 프레임 바이트 그대로 이어 붙이기)
+#   두 경로의 segments(start/end)가 float 까지 같은지, 병합 파일을 디코딩한 길이가 마지막 end 와 같은지(샘플 단위) 확인한다.
+#   ElevenLabs(44.1kHz 스테레오 128k) / Polly(24kHz 모노 48k) 형식을 흉내 낸 갭리스 헤더 없는 mp3를 만든다.
+#
+#   python benchmarks/bench_audio_concat.py
+#   python benchmarks/bench_audio_concat.py --lines 80 --output concat.json
+import os, sys, json, time, random, argparse, tempfile, subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from pydub import AudioSegment
+from ffmpeg_renderer import ffmpeg_path
+import generate_timed_segments as gts
+
+LINES = 30
+FORMATS = {
+    "elevenlabs": ["-ar", "44100", "-ac", "2", "-b:a", "128k"],
+    "polly": ["-ar", "24000", "-ac", "1", "-b:a", "48k"],
+}
+
+
+def make_lines(work_dir, name, count, rng):
+    paths = []
+    for i in range(count):
+        path = os.path.join(work_dir, f"{name}_{i}.mp3")
+        subprocess.run([
+            ffmpeg_path, "-y", "-loglevel", "error",
+            "-f", "lavfi", "-i", f"sine=frequency={200 + 20 * i}:duration={rng.uniform(0.8, 4.0):.3f}",
+            *FORMATS[name], "-c:a", "libmp3lame", "-write_xing", "0", path,
+        ], check=True)
+        paths.append(path)
+    return paths
+
+
+def timed(fn, *args):
+    t0 = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - t0
+
+
+def main():
+    ap = argparse.ArgumentParser(description="per-line TTS mp3 merge benchmark (decode vs frame concat)")
+    ap.add_argument("--lines", type=int, default=LINES)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--output", help="결과 JSON 저장 경로 (기본: 표준출력)")
+    args = ap.parse_args()
+
+    rng = random.Random(args.seed)
+    results, failed = [], False
+    with tempfile.TemporaryDirectory(prefix="bench_audio_concat_") as work_dir:
+        for name in FORMATS:
+            paths = make_lines(work_dir, name, args.lines, rng)
+            decoded, t_decoded = timed(gts._merge_audio_files_decoded, paths, os.path.join(work_dir, f"{name}_dec.mp3"))
+            merged_path = os.path.join(work_dir, f"{name}_cat.mp3")
+            framed, t_framed = timed(gts.merge_audio_files, paths, merged_path)
+            merged_len = AudioSegment.from_file(merged_path).duration_seconds
+            # 병합 파일 길이는 전체 샘플 수 / 샘플레이트, last end 는 라인 길이의 누적 합이라 float 오차만 허용
+            ok = framed == decoded and abs(merged_len - framed[-1]["end"]) < 1e-6
+            failed |= not ok
+            results.append({
+                "format": name,
+                "lines": args.lines,
+                "decoded_s": round(t_decoded, 3),
+                "frames_s": round(t_framed, 4),
+                "segments_identical": framed == decoded,
+                "merged_duration_s": merged_len,
+                "last_end_s": framed[-1]["end"],
+            })
+            print(f"{'✅' if ok else '❌'} {name}: {t_decoded:.2f}s -> {t_framed:.3f}s, "
+                  f"segments {'identical' if framed == decoded else 'DIFFER'}, "
+                  f"merged {merged_len:.6f}s / last end {framed[-1]['end']:.6f}s", file=sys.stderr)
+
+    text = json.dumps({"created": time.strftime("%Y-%m-%d %H:%M:%S"), "results": results},
+                      ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+    else:
+        print(text)
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
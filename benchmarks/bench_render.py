@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# video_maker 렌더 경로 오프라인 벤치마크 (네트워크 불필요)
+#   합성 이미지 / 세그먼트 타임라인 / 톤 오디오 / 제목을 로컬에서 만들고
+#   렌더 경로 x 세그먼트 수 x 해상도 조합마다 벽시계 시간, 초당 프레임, CPU 초, 최대 RSS 를 JSON으로 기록한다.
+#
+#   python benchmarks/bench_render.py --output bench.json
+#   python benchmarks/bench_render.py --quick --baseline benchmarks/render_baseline.json   # 회귀 시 exit 1
+#   python benchmarks/bench_render.py --quick --repeat 5 --save-baseline benchmarks/render_baseline.json
+#
+# 케이스마다 자식 프로세스로 실행해서 RSS/CPU 측정이 서로 섞이지 않게 한다.
+import os, sys, json, time, argparse, platform, resource, random, subprocess, tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+FPS = 24
+SCRIPT_TEXT = (
+    "오늘은 조금 늦게 일어났다. 창밖으로 비가 내리고 있었고, 나는 그 소리를 오래 들었다.\n\n"
+    "우리는 가끔 아무 이유 없이 마음이 무거워진다. 그럴 때면 천천히 숨을 쉬어 본다. "
+)
+TITLE = "비 오는 날의 조용한 생각들"
+
+# 렌더 경로: (함수, renderer)
+PATHS = {
+    "segments/moviepy": ("segments", "moviepy"),
+    "segments/ffmpeg": ("segments", "ffmpeg"),
+    "segments/ffmpeg_parallel": ("segments", "ffmpeg_parallel"),
+    "segments/pipe": ("segments", "pipe"),
+    "dark_text/moviepy": ("dark_text", "moviepy"),
+    "dark_text/ffmpeg": ("dark_text", "ffmpeg"),
+}
+# 해상도: (합성 원본 이미지 크기, 인코더 프로파일)
+RESOLUTIONS = {
+    "hd-src/publish": ((1280, 853), "publish"),
+    "4k-src/publish": ((3840, 2560), "publish"),
+    "hd-src/draft": ((1280, 853), "draft"),
+}
+SEGMENT_COUNTS = [4, 12]
+QUICK = {
+    "paths": ["segments/moviepy", "segments/ffmpeg", "segments/pipe", "dark_text/ffmpeg"],
+    "resolutions": ["hd-src/draft"],
+    "segments": [4],
+}
+SEGMENT_SECONDS = 1.5
+REGRESSION_THRESHOLD = 0.15  # 기준 대비 15% 이상 느려지면 회귀
+
+
+# ===== 합성 입력 =====
+def make_images(work_dir, size, count):
+    import numpy as np
+    from PIL import Image, ImageDraw
+    rng = random.Random(size[0] * 31 + count)
+    paths = []
+    w, h = size
+    yy, xx = np.mgrid[0:h, 0:w]
+    for i in range(count):
+        # 그라데이션 + 원 몇 개 (JPEG 디코딩/리사이즈 비용이 실제 사진과 비슷하도록)
+        base = np.stack([
+            (xx * 255 // max(w - 1, 1) + i * 40) % 256,
+            (yy * 255 // max(h - 1, 1) + i * 70) % 256,
+            ((xx + yy) * 255 // max(w + h - 2, 1) + i * 20) % 256,
+        ], axis=-1).astype("uint8")
+        im = Image.fromarray(base)
+        draw = ImageDraw.Draw(im)
+        for _ in range(12):
+            r = rng.randint(h // 20, h // 6)
+            cx, cy = rng.randint(0, w), rng.randint(0, h)
+            draw.ellipse((cx - r, cy - r, cx + r, cy + r),
+                         fill=(rng.randint(0, 255), rng.randint(0, 255), rng.randint(0, 255)))
+        p = os.path.join(work_dir, f"img_{size[0]}x{size[1]}_{i}.jpg")
+        im.save(p, quality=90)
+        paths.append(p)
+    return paths
+
+
+def make_tone(path, duration, freq):
+    from ffmpeg_renderer import ffmpeg_path
+    subprocess.run([
+        ffmpeg_path, "-y", "-loglevel", "error",
+        "-f", "lavfi", "-i", f"sine=frequency={freq}:duration={duration:.3f}:sample_rate=44100",
+        "-ac", "2", "-b:a", "128k", path,
+    ], check=True)
+    return path
+
+
+def make_segments(count):
+    return [{"start": i * SEGMENT_SECONDS, "end": (i + 1) * SEGMENT_SECONDS, "text": f"세그먼트 {i + 1}"}
+            for i in range(count)]
+
+
+# ===== 케이스 실행 (자식 프로세스) =====
+def run_case(case):
+    """한 케이스를 렌더링하고 측정값 dict 반환. 현재 프로세스에서 실행됨."""
+    import image_cache
+    from disk_cache import DiskCache
+    import video_maker as vm
+
+    func, renderer = PATHS[case["path"]]
+    src_size, profile = RESOLUTIONS[case["resolution"]]
+    n = case["segments"]
+
+    with tempfile.TemporaryDirectory(prefix="bench_render_") as work_dir:
+        # 이미지 캐시는 매 케이스 비운 상태(콜드)로 측정
+        image_cache._disk = DiskCache("images", image_cache.DISK_MAX_BYTES, root=work_dir)
+        duration = n * SEGMENT_SECONDS
+        narration = make_tone(os.path.join(work_dir, "narration.mp3"), duration, 440)
+        bgm = make_tone(os.path.join(work_dir, "bgm.mp3"), 7.0, 220)
+        save_path = os.path.join(work_dir, "out.mp4")
+
+        if func == "segments":
+            images = make_images(work_dir, src_size, min(n, 4))
+            args = dict(
+                image_paths=list(images), segments=make_segments(n), audio_path=narration,
+                topic_title=TITLE, bgm_path=bgm, save_path=save_path,
+                renderer=renderer, encoder=profile, motion_seed=case.get("seed", 0),
+            )
+            render = vm.create_video_with_segments
+        else:
+            # 본문 길이를 세그먼트 수에 비례시켜 레이아웃 피팅 비용도 함께 측정
+            args = dict(
+                script_text=SCRIPT_TEXT * max(1, n // 4), title_text=TITLE,
+                audio_path=narration, bgm_path=bgm, save_path=save_path,
+                renderer=renderer, encoder=profile,
+            )
+            render = vm.create_dark_text_video
+
+        self_before = resource.getrusage(resource.RUSAGE_SELF)
+        child_before = resource.getrusage(resource.RUSAGE_CHILDREN)
+        t0 = time.perf_counter()
+        render(**args)
+        wall = time.perf_counter() - t0
+        self_after = resource.getrusage(resource.RUSAGE_SELF)
+        child_after = resource.getrusage(resource.RUSAGE_CHILDREN)
+
+    cpu = (self_after.ru_utime - self_before.ru_utime + self_after.ru_stime - self_before.ru_stime
+           + child_after.ru_utime - child_before.ru_utime + child_after.ru_stime - child_before.ru_stime)
+    frames = round(duration * FPS)
+    return {
+        **case,
+        "wall_s": round(wall, 3),
+        "fps": round(frames / wall, 2) if wall > 0 else None,
+        "cpu_s": round(cpu, 3),
+        # Linux ru_maxrss 는 KiB 단위. 자식 값은 가장 컸던 자식 하나(ffmpeg 등)의 최대 RSS
+        "peak_rss_mb": round(self_after.ru_maxrss / 1024, 1),
+        "peak_child_rss_mb": round(child_after.ru_maxrss / 1024, 1),
+        "frames": frames,
+    }
+
+
+def spawn_case(case):
+    result = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--case", json.dumps(case)],
+        cwd=ROOT, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True,
+    )
+    lines = [l for l in result.stdout.splitlines() if l.startswith("{")]
+    if result.returncode != 0 or not lines:
+        return {**case, "error": f"exit code {result.returncode}"}
+    return json.loads(lines[-1])
+
+
+# ===== 기준 비교 =====
+def case_key(r):
+    return f"{r['path']}|{r['resolution']}|{r['segments']}"
+
+
+def compare(results, baseline, threshold):
+    base = {case_key(r): r for r in baseline.get("results", [])}
+    regressions = []
+    for r in results:
+        b = base.get(case_key(r))
+        if not b or "error" in r or "error" in b:
+            continue
+        ratio = r["wall_s"] / b["wall_s"] if b["wall_s"] else 1.0
+        r["baseline_wall_s"] = b["wall_s"]
+        r["wall_ratio"] = round(ratio, 3)
+        if ratio > 1 + threshold:
+            regressions.append(r)
+    return regressions
+
+
+def main():
+    ap = argparse.ArgumentParser(description="offline render benchmark for video_maker")
+    ap.add_argument("--paths", nargs="+", choices=list(PATHS), help="측정할 렌더 경로 (기본: 전체)")
+    ap.add_argument("--resolutions", nargs="+", choices=list(RESOLUTIONS), help="원본 크기/프로파일 조합 (기본: 전체)")
+    ap.add_argument("--segments", nargs="+", type=int, help=f"세그먼트 수 목록 (기본: {SEGMENT_COUNTS})")
+    ap.add_argument("--quick", action="store_true", help="CI용 작은 조합만 실행")
+    ap.add_argument("--output", help="결과 JSON 저장 경로 (기본: 표준출력)")
+    ap.add_argument("--baseline", help="비교할 기준 JSON. 회귀가 있으면 exit 1")
+    ap.add_argument("--save-baseline", help="이번 결과를 기준 JSON으로 저장")
+    ap.add_argument("--repeat", type=int, default=1, help="케이스마다 N번 실행해 벽시계 시간 중간값 결과를 기록 (기준 저장 시 권장)")
+    ap.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD, help="회귀 판정 비율 (0.15 = 15%%)")
+    ap.add_argument("--case", help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.case:
+        print(json.dumps(run_case(json.loads(args.case))))
+        return
+
+    paths = args.paths or (QUICK["paths"] if args.quick else list(PATHS))
+    resolutions = args.resolutions or (QUICK["resolutions"] if args.quick else list(RESOLUTIONS))
+    seg_counts = args.segments or (QUICK["segments"] if args.quick else SEGMENT_COUNTS)
+
+    results = []
+    for path in paths:
+        for res in resolutions:
+            for n in seg_counts:
+                case = {"path": path, "resolution": res, "segments": n}
+                runs = [spawn_case(case) for _ in range(max(1, args.repeat))]
+                ok = sorted((x for x in runs if "error" not in x), key=lambda x: x["wall_s"])
+                r = ok[len(ok) // 2] if len(ok) == len(runs) else next(x for x in runs if "error" in x)
+                results.append(r)
+                if "error" in r:
+                    print(f"❌ {case_key(r)}: {r['error']}", file=sys.stderr)
+                else:
+                    print(f"⏱️ {case_key(r)}: {r['wall_s']}s, {r['fps']} fps, cpu {r['cpu_s']}s, "
+                          f"rss {r['peak_rss_mb']}MB (child {r['peak_child_rss_mb']}MB)", file=sys.stderr)
+
+    report = {
+        "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "machine": {"python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count()},
+        "results": results,
+    }
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        report["regressions"] = [case_key(r) for r in regressions]
+        for r in regressions:
+            print(f"⚠️ 회귀: {case_key(r)} {r['baseline_wall_s']}s -> {r['wall_s']}s (x{r['wall_ratio']})", file=sys.stderr)
+
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+    else:
+        print(text)
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            f.write(text)
+
+    if regressions or any("error" in r for r in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
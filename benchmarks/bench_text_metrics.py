@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# TextClip 기반 폭 측정 vs text_metrics(Pillow 메트릭 + LRU) 마이크로 벤치마크
+#   python benchmarks/bench_text_metrics.py --repeat 3
+import os, sys, time, argparse
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from moviepy import TextClip
+import text_metrics
+from text_metrics import text_width
+
+FONT_PATH = os.path.join(ROOT, "assets", "fonts", "Pretendard-Bold.ttf")
+SAMPLE = (
+    "오늘은 조금 늦게 일어났다. 창밖으로 비가 내리고 있었고, 나는 그 소리를 오래 들었다. "
+    "우리는 가끔 아무 이유 없이 마음이 무거워진다. 그럴 때면 천천히 숨을 쉬어 본다. "
+    "Sometimes the smallest step is the one that moves you the most."
+)
+
+
+def textclip_width(s: str, fs: int) -> int:
+    # 기존 video_maker 방식: label TextClip을 만들어 .w 만 읽고 닫음
+    if not s:
+        return 0
+    c = TextClip(text=s, font=FONT_PATH, font_size=fs, method="label")
+    w = c.w
+    c.close()
+    return w
+
+
+def wrap_probes(text: str):
+    # wrap_to_width가 측정하는 후보 문자열(누적 단어열)을 그대로 재현
+    words = text.split()
+    return [" ".join(words[:i + 1]) for i in range(len(words))]
+
+
+def run(measure, probes, font_sizes):
+    t0 = time.perf_counter()
+    for fs in font_sizes:
+        for p in probes:
+            measure(p, fs)
+    return time.perf_counter() - t0
+
+
+def main():
+    ap = argparse.ArgumentParser(description="text width measurement micro-benchmark")
+    ap.add_argument("--repeat", type=int, default=3, help="같은 측정을 반복하는 횟수 (피팅 루프 재현)")
+    args = ap.parse_args()
+
+    probes = wrap_probes(SAMPLE)
+    font_sizes = list(range(28, 13, -2))
+    n = len(probes) * len(font_sizes)
+
+    # 결과 일치 확인
+    mismatches = sum(
+        textclip_width(p, fs) != text_width(p, FONT_PATH, fs)
+        for fs in font_sizes[:2] for p in probes
+    )
+
+    t_clip = sum(run(textclip_width, probes, font_sizes) for _ in range(args.repeat))
+    text_metrics.text_width.cache_clear()
+    t_cold = run(lambda s, fs: text_width(s, FONT_PATH, fs), probes, font_sizes)
+    t_warm = sum(run(lambda s, fs: text_width(s, FONT_PATH, fs), probes, font_sizes) for _ in range(args.repeat - 1))
+
+    total = n * args.repeat
+    print(f"measurements : {total} ({len(probes)} probes x {len(font_sizes)} sizes x {args.repeat})")
+    print(f"mismatches   : {mismatches}")
+    print(f"TextClip     : {t_clip:.3f}s ({t_clip / total * 1e6:.1f} us/measure)")
+    print(f"text_metrics : {t_cold + t_warm:.3f}s (cold {t_cold:.3f}s, warm {t_warm:.4f}s)")
+    print(f"speedup      : x{t_clip / max(t_cold + t_warm, 1e-9):.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# TextClip 합성 vs text_raster(Pillow 직접 그리기) 마이크로 벤치마크
+#   타이틀바 오버레이와 다크 텍스트 본문(줄마다 TextClip)을 두 방식으로 만들어 시간/할당량을 비교한다.
+#   python benchmarks/bench_text_raster.py --repeat 5
+import os, sys, time, argparse, tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import numpy as np
+from PIL import Image, ImageDraw
+from moviepy import TextClip, ColorClip, CompositeVideoClip
+from text_metrics import wrap_preserving_newlines, text_width
+from text_raster import layout_lines, line_height, draw_layout
+
+FONT_PATH = os.path.join(ROOT, "assets", "fonts", "Pretendard-Bold.ttf")
+TITLE = "비 오는 날의\n조용한 생각들"
+BODY = (
+    "오늘은 조금 늦게 일어났다. 창밖으로 비가 내리고 있었고, 나는 그 소리를 오래 들었다.\n\n"
+    "우리는 가끔 아무 이유 없이 마음이 무거워진다. 그럴 때면 천천히 숨을 쉬어 본다.\n\n"
+    "Sometimes the smallest step is the one that moves you the most."
+)
+WIDTH, BODY_FS, WRAP_W = 720, 28, 560
+
+
+def center_label_multiline(raw_text, font_path, font_size, pad_char="\u00A0"):
+    # 기존 방식 재현용: label TextClip은 왼쪽 정렬이라 각 줄 앞에 NBSP를 채워 시각적으로 가운데 정렬
+    lines = [b if b.strip() else "" for b in raw_text.split("\n")]
+    maxw = max((text_width(l, font_path, font_size) for l in lines), default=0)
+    spacew = max(text_width(pad_char, font_path, font_size), 1)
+    centered = []
+    for l in lines:
+        lw = text_width(l, font_path, font_size)
+        pad = int(round((maxw - lw) / (2 * spacew))) if maxw > lw else 0
+        centered.append(pad_char * pad + l)
+    return "\n".join(centered) + "\n"
+
+
+def textclip_title():
+    # 기존 방식(moviepy 2.x 에서 실제로 타던 label 폴백): NBSP 가운데 정렬 label TextClip
+    # + 높이 측정용 dummy + ColorClip 바를 합성해서 한 프레임 추출
+    clip = TextClip(text=center_label_multiline(TITLE, FONT_PATH, 48), font_size=48, color="white", font=FONT_PATH,
+                    stroke_color="skyblue", stroke_width=1, method="label")
+    dummy = TextClip(text=TITLE, font_size=48, font=FONT_PATH, method="label")
+    bar = ColorClip(size=(WIDTH, dummy.h + 32), color=(0, 0, 0))
+    layer = CompositeVideoClip([bar, clip.with_position(("center", 10))], size=(WIDTH, bar.h)).with_duration(1)
+    frame = layer.get_frame(0)
+    for c in (layer, bar, clip, dummy):
+        c.close()
+    return frame
+
+
+def raster_title():
+    layout = layout_lines(TITLE.split("\n"), FONT_PATH, 48, stroke_width=1)
+    canvas = Image.new("RGBA", (WIDTH, layout["height"] + 32), (0, 0, 0, 255))
+    draw_layout(ImageDraw.Draw(canvas), layout, round((WIDTH - layout["width"]) / 2), 16, FONT_PATH, 48,
+                stroke_fill="skyblue", stroke_width=1, align="center")
+    return np.asarray(canvas)
+
+
+def textclip_body():
+    # 기존 방식: 줄마다 label TextClip(NBSP + 줄 + 개행 + HAIR)을 세로로 쌓아 합성
+    clips, y, maxw = [], 0, 1
+    for line in wrap_preserving_newlines(BODY, WRAP_W, FONT_PATH, BODY_FS):
+        if not line:
+            y += BODY_FS + 8
+            continue
+        c = TextClip(text="\u00A0" + line + "\n\u200A", font=FONT_PATH, font_size=BODY_FS, color="white",
+                     method="label", interline=0)
+        clips.append(c.with_position((0, y)))
+        y += c.h + 10
+        maxw = max(maxw, c.w)
+    body = CompositeVideoClip(clips, size=(maxw, y)).with_duration(1)
+    frame = body.get_frame(0)
+    body.close()
+    for c in clips:
+        c.close()
+    return frame
+
+
+def raster_body():
+    lines = wrap_preserving_newlines(BODY, WRAP_W, FONT_PATH, BODY_FS)
+    layout = layout_lines(lines, FONT_PATH, BODY_FS, advance=round(line_height(FONT_PATH, BODY_FS) * 1.75),
+                          blank_advance=BODY_FS + 8)
+    canvas = Image.new("RGB", (max(1, layout["width"]), layout["height"]), (0, 0, 0))
+    draw_layout(ImageDraw.Draw(canvas), layout, 0, 0, FONT_PATH, BODY_FS)
+    return np.asarray(canvas)
+
+
+def measure(fn, repeat):
+    fn()  # 폰트/레이아웃 캐시 워밍업
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    elapsed = time.perf_counter() - t0
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed / repeat, peak
+
+
+def main():
+    ap = argparse.ArgumentParser(description="TextClip vs Pillow text rasterizer micro-benchmark")
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args()
+
+    for name, old, new in (("title", textclip_title, raster_title), ("body", textclip_body, raster_body)):
+        t_old, m_old = measure(old, args.repeat)
+        t_new, m_new = measure(new, args.repeat)
+        print(f"{name:6s} TextClip {t_old * 1e3:8.1f} ms, peak {m_old / 1e6:6.1f} MB | "
+              f"text_raster {t_new * 1e3:7.1f} ms, peak {m_new / 1e6:5.1f} MB | x{t_old / max(t_new, 1e-9):.1f}")
+
+
+if __name__ == "__main__":
+    main()
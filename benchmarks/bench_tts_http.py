@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# TTS HTTP 연결 풀 / 재시도 벤치마크 (네트워크 불필요: 로컬 ElevenLabs 스텁 서버)
+#   before: 라인마다 requests.post (세션 없음 = 매번 새 TCP+TLS 연결, 타임아웃/재시도 없음)
+#   after : elevenlabs_tts.generate_elevenlabs_tts (공유 keep-alive 풀 + 타임아웃 + 429/5xx 재시도)
+#   를 같은 스텁에 보내서 라인당 지연(평균/p50/p95)과 실패 수를 비교한다.
+#   스텁은 openssl CLI로 만든 자체 서명 인증서로 TLS를 쓴다 (--no-tls 면 평문 HTTP).
+#
+#   python benchmarks/bench_tts_http.py
+#   python benchmarks/bench_tts_http.py --lines 50 --latency-ms 30 --fail-every 7 --output tts_http.json
+import os, sys, json, time, argparse, tempfile, threading, subprocess, ssl, statistics
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import requests
+import elevenlabs_tts
+
+LINES = 30
+LATENCY_MS = 20     # 스텁의 합성 대기 시간
+FAIL_EVERY = 10     # N번째 요청마다 503 한 번 (0이면 실패 없음)
+AUDIO_BYTES = 32 * 1024
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+    disable_nagle_algorithm = True  # 헤더/본문을 나눠 써도 keep-alive 연결에서 delayed-ACK 대기가 없게
+    counter = 0
+    lock = threading.Lock()
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        with StubHandler.lock:
+            StubHandler.counter += 1
+            n = StubHandler.counter
+        fail_every = self.server.fail_every
+        if fail_every and n % fail_every == 0:
+            body, status = b"busy", 503
+        else:
+            time.sleep(self.server.latency)
+            body, status = b"\xff\xfb" * (AUDIO_BYTES // 2), 200
+        self.send_response(status)
+        self.send_header("Content-Type", "audio/mpeg" if status == 200 else "text/plain")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def make_cert(work_dir):
+    cert, key = os.path.join(work_dir, "stub.crt"), os.path.join(work_dir, "stub.key")
+    subprocess.run(["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "1",
+                    "-subj", "/CN=127.0.0.1", "-addext", "subjectAltName=IP:127.0.0.1",
+                    "-keyout", key, "-out", cert], check=True, capture_output=True)
+    return cert, key
+
+
+def start_stub(latency_ms, fail_every, cert=None):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    server.daemon_threads = True
+    server.latency, server.fail_every = latency_ms / 1000, fail_every
+    scheme = "http"
+    if cert:
+        ctx = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        ctx.load_cert_chain(*cert)
+        server.socket = ctx.wrap_socket(server.socket, server_side=True)
+        scheme = "https"
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"{scheme}://127.0.0.1:{server.server_address[1]}"
+
+
+def before(base, text, save_path, verify):
+    # 기존 generate_elevenlabs_tts 요청 방식 그대로 (세션/타임아웃/재시도 없음)
+    response = requests.post(f"{base}/v1/text-to-speech/stub", headers={"xi-api-key": "stub"},
+                             json={"text": text}, verify=verify)
+    if response.status_code != 200:
+        raise RuntimeError(f"{response.status_code}")
+    with open(save_path, "wb") as f:
+        f.write(response.content)
+
+
+def after(base, text, save_path, verify):
+    elevenlabs_tts.generate_elevenlabs_tts(text, save_path, "default", "stub")
+
+
+def run_case(name, call, base, verify, lines, work_dir):
+    StubHandler.counter = 0
+    latencies, failures = [], 0
+    for i in range(lines):
+        t0 = time.perf_counter()
+        try:
+            call(base, f"line {i}", os.path.join(work_dir, f"{name}_{i}.mp3"), verify)
+        except Exception:
+            failures += 1
+        latencies.append((time.perf_counter() - t0) * 1000)
+    latencies.sort()
+    return {
+        "mode": name,
+        "lines": lines,
+        "failures": failures,
+        "requests": StubHandler.counter,
+        "mean_ms": round(statistics.mean(latencies), 2),
+        "p50_ms": round(latencies[len(latencies) // 2], 2),
+        "p95_ms": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))], 2),
+        "total_s": round(sum(latencies) / 1000, 3),
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(description="TTS HTTP pooling/retry benchmark against a local stub")
+    ap.add_argument("--lines", type=int, default=LINES)
+    ap.add_argument("--latency-ms", type=float, default=LATENCY_MS)
+    ap.add_argument("--fail-every", type=int, default=FAIL_EVERY, help="N번째 요청마다 503 (0: 실패 없음)")
+    ap.add_argument("--no-tls", action="store_true", help="평문 HTTP 스텁 (openssl 없을 때)")
+    ap.add_argument("--output", help="결과 JSON 저장 경로 (기본: 표준출력)")
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="bench_tts_http_") as work_dir:
+        cert = None if args.no_tls else make_cert(work_dir)
+        server, base = start_stub(args.latency_ms, args.fail_every, cert)
+        verify = cert[0] if cert else True
+        elevenlabs_tts.ELEVEN_API_BASE = base
+        session = elevenlabs_tts.get_http_session()
+        session.verify = verify
+        session.trust_env = False  # REQUESTS_CA_BUNDLE 같은 환경 변수가 스텁 인증서 지정을 덮어쓰지 않게
+
+        results = []
+        for name, call in (("before", before), ("after", after)):
+            results.append(run_case(name, call, base, verify, args.lines, work_dir))
+            r = results[-1]
+            print(f"⏱️ {name}: mean {r['mean_ms']}ms, p50 {r['p50_ms']}ms, p95 {r['p95_ms']}ms, "
+                  f"failures {r['failures']}/{r['lines']} (requests {r['requests']})", file=sys.stderr)
+        server.shutdown()
+
+    report = {
+        "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "tls": cert is not None,
+        "latency_ms": args.latency_ms,
+        "fail_every": args.fail_every,
+        "results": results,
+    }
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# 스트리밍 TTS 조립 파이프라인 벤치마크 (네트워크 불필요: 로컬 ElevenLabs 스텁 서버, mp3 생성에 ffmpeg 필요)
+#   per_line: generate_tts_per_line (응답 본문 전체를 받은 뒤 저장) -> merge_audio_files
+#   stream  : generate_tts_streamed (/stream 청크를 받는 대로 라인 파일 + 전체 오디오에 이어 붙이고 길이 계산)
+#   스텁은 라인별 mp3를 청크마다 일정 시간 쉬면서 보내 느린 합성/전송을 흉내 낸다.
+#   전체 오디오 완성까지 걸린 시간, 파이썬 힙 최대 사용량(tracemalloc), 두 모드의 segments/병합 파일이 같은지 확인.
+#
+#   python benchmarks/bench_tts_stream.py
+#   python benchmarks/bench_tts_stream.py --lines 40 --chunk-ms 15 --output tts_stream.json
+import os, sys, json, time, random, argparse, tempfile, threading, subprocess, tracemalloc
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from ffmpeg_renderer import ffmpeg_path
+import elevenlabs_tts
+import generate_timed_segments as gts
+
+LINES = 20
+CHUNK_BYTES = 4 * 1024   # 스텁이 한 번에 보내는 바이트
+CHUNK_MS = 10            # 청크 사이 대기 (합성/전송 속도)
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+        audio = self.server.audio[int(body["text"].split()[-1])]
+        self.send_response(200)
+        self.send_header("Content-Type", "audio/mpeg")
+        self.send_header("Content-Length", str(len(audio)))
+        self.end_headers()
+        for pos in range(0, len(audio), CHUNK_BYTES):
+            time.sleep(self.server.chunk_delay)
+            self.wfile.write(audio[pos:pos + CHUNK_BYTES])
+            self.wfile.flush()
+
+    def log_message(self, *args):
+        pass
+
+
+def make_audio(work_dir, count, rng, max_seconds):
+    audio = []
+    for i in range(count):
+        path = os.path.join(work_dir, f"src_{i}.mp3")
+        subprocess.run([
+            ffmpeg_path, "-y", "-loglevel", "error",
+            "-f", "lavfi", "-i", f"sine=frequency={200 + 20 * i}:duration={rng.uniform(max_seconds * 0.3, max_seconds):.3f}",
+            "-ar", "44100", "-ac", "2", "-b:a", "128k", "-c:a", "libmp3lame", "-write_xing", "0", path,
+        ], check=True)
+        with open(path, "rb") as f:
+            audio.append(f.read())
+    return audio
+
+
+def per_line(lines, output_path):
+    paths = gts.generate_tts_per_line(lines, "elevenlabs", "default", cache=False)
+    return gts.merge_audio_files(paths, output_path)
+
+
+def stream(lines, output_path):
+    return gts.generate_tts_streamed(lines, output_path, "elevenlabs", "default", cache=False)
+
+
+def run_case(name, fn, lines, work_dir):
+    output_path = os.path.join(work_dir, f"{name}.mp3")
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    segments = fn(lines, output_path)
+    elapsed = time.perf_counter() - t0
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    with open(output_path, "rb") as f:
+        merged = f.read()
+    return segments, merged, {"mode": name, "seconds": round(elapsed, 3), "peak_heap_kb": peak // 1024}
+
+
+def main():
+    global CHUNK_BYTES
+    ap = argparse.ArgumentParser(description="streaming TTS assembly benchmark against a local stub")
+    ap.add_argument("--lines", type=int, default=LINES)
+    ap.add_argument("--chunk-ms", type=float, default=CHUNK_MS)
+    ap.add_argument("--chunk-bytes", type=int, default=CHUNK_BYTES)
+    ap.add_argument("--max-seconds", type=float, default=5.0, help="라인 음성 최대 길이 (길수록 응답 본문이 큼)")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--output", help="결과 JSON 저장 경로 (기본: 표준출력)")
+    args = ap.parse_args()
+    CHUNK_BYTES = args.chunk_bytes
+
+    with tempfile.TemporaryDirectory(prefix="bench_tts_stream_") as work_dir:
+        server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+        server.daemon_threads = True
+        server.audio = make_audio(work_dir, args.lines, random.Random(args.seed), args.max_seconds)
+        server.chunk_delay = args.chunk_ms / 1000
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        elevenlabs_tts.ELEVEN_API_BASE = f"http://127.0.0.1:{server.server_address[1]}"
+        elevenlabs_tts.get_http_session().trust_env = False
+
+        lines = [f"line {i}" for i in range(args.lines)]
+        cwd = os.getcwd()
+        os.chdir(work_dir)  # temp_line_audios/ 를 작업 폴더 안에 만들도록
+        try:
+            results, outputs = [], {}
+            for name, fn in (("per_line", per_line), ("stream", stream)):
+                segments, merged, result = run_case(name, fn, lines, work_dir)
+                outputs[name] = (segments, merged)
+                results.append(result)
+                print(f"⏱️ {name}: {result['seconds']}s, peak heap {result['peak_heap_kb']}KB", file=sys.stderr)
+        finally:
+            os.chdir(cwd)
+        server.shutdown()
+
+    same_segments = outputs["per_line"][0] == outputs["stream"][0]
+    same_audio = outputs["per_line"][1] == outputs["stream"][1]
+    print(f"{'✅' if same_segments and same_audio else '❌'} segments {'identical' if same_segments else 'DIFFER'}, "
+          f"merged audio {'identical' if same_audio else 'DIFFERS'}", file=sys.stderr)
+
+    report = {
+        "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "lines": args.lines,
+        "chunk_bytes": CHUNK_BYTES,
+        "chunk_ms": args.chunk_ms,
+        "max_seconds": args.max_seconds,
+        "segments_identical": same_segments,
+        "audio_identical": same_audio,
+        "results": results,
+    }
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+    else:
+        print(text)
+    if not (same_segments and same_audio):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# 고정 구간 VFR hold 벤치마크 (네트워크 불필요)
+#   같은 입력을 hold_static=False(24fps 복제) / True(VFR hold)로 렌더링해서
+#   벽시계 시간, 자식 프로세스 CPU 초, 파일 크기, 실제 인코딩된 프레임 수를 비교한다.
+#   hold 출력을 24fps로 디코딩한 프레임 수, 비디오 재생 길이, 프레임별 PSNR이 CFR 출력과 맞는지도 확인 (다르면 exit 1).
+#   subtitles: ffmpeg 렌더 후 add_subtitles_to_video 로 자막을 따로 굽는 runner 기본 경로
+#
+#   python benchmarks/bench_vfr.py
+#   python benchmarks/bench_vfr.py --renderers pipe --static-ratio 1.0 --seed 1 --output vfr.json
+import os, re, sys, json, time, random, argparse, resource, subprocess, tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_render import make_images, make_tone, SEGMENT_SECONDS, SCRIPT_TEXT, TITLE
+from ffmpeg_renderer import FPS
+
+RENDERERS = ["ffmpeg", "ffmpeg_parallel", "pipe", "dark_text", "subtitles"]
+SEGMENTS = 8
+STATIC_RATIO = 0.5  # 세그먼트 중 static 모션 비율 (나머지는 줌/패닝)
+MIN_PSNR = 30.0     # hold/CFR 같은 시각 프레임의 PSNR 하한. 더 낮으면 화면이 다름 (자막이 늦게 바뀌는 등)
+
+
+def _framemd5(path, *args):
+    """비디오 스트림 framemd5 행 목록과 타임베이스"""
+    from ffmpeg_renderer import ffmpeg_path
+    out = subprocess.run([ffmpeg_path, "-i", path, "-map", "0:v", *args, "-f", "framemd5", "-"],
+                         stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True).stdout
+    num, den = re.search(r"#tb 0: (\d+)/(\d+)", out).groups()
+    rows = [line.split(",") for line in out.splitlines() if line and not line.startswith("#")]
+    return rows, int(num) / int(den)
+
+
+def packet_stats(path):
+    """(비디오 스트림에 실제로 들어간 프레임(패킷) 수, 비디오 재생 길이(초) = 마지막 프레임 pts + 길이)"""
+    rows, tb = _framemd5(path, "-c", "copy")
+    return len(rows), max(int(r[2]) + int(r[3]) for r in rows) * tb
+
+
+def decoded_frames(path):
+    """24fps로 다시 샘플링해 디코딩한 프레임 수. hold 출력이 CFR과 같은 타임라인인지 비교용"""
+    rows, _ = _framemd5(path, "-vf", f"fps={FPS}")
+    return len(rows)
+
+
+def min_psnr(path_a, path_b):
+    """두 영상을 24fps로 맞춰 디코딩했을 때 프레임별 PSNR(avg) 최솟값"""
+    from ffmpeg_renderer import ffmpeg_path
+    out = subprocess.run([ffmpeg_path, "-i", path_a, "-i", path_b,
+                          "-lavfi", f"[0:v]fps={FPS}[a];[1:v]fps={FPS}[b];[a][b]psnr=stats_file=-", "-f", "null", "-"],
+                         stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True).stdout
+    values = [float(v) for v in re.findall(r"psnr_avg:(\S+)", out)]
+    return min(values) if values else 0.0
+
+
+def make_uneven_segments(count, rng):
+    """길이가 제각각인 세그먼트 타임라인 (경계가 프레임 단위로 딱 떨어지지 않도록).
+    자막이 바뀌는 게 화면에서 잘 보이도록 세그먼트마다 다른 문장을 넣는다."""
+    sentences = [s for s in re.split(r"(?<=[.,])\s+", SCRIPT_TEXT.strip()) if s]
+    segments, t = [], 0.0
+    for i in range(count):
+        d = round(rng.uniform(SEGMENT_SECONDS * 0.6, SEGMENT_SECONDS * 1.8), 3)
+        segments.append({"start": t, "end": t + d, "text": sentences[i % len(sentences)]})
+        t += d
+    return segments
+
+
+def case_path(work_dir, renderer, hold):
+    return os.path.join(work_dir, f"{renderer}_{'hold' if hold else 'cfr'}.mp4")
+
+
+def run_case(renderer, hold, work_dir, inputs, static_ratio):
+    import video_maker as vm
+    save_path = case_path(work_dir, renderer, hold)
+    if renderer == "dark_text":
+        render = lambda: vm.create_dark_text_video(
+            SCRIPT_TEXT, TITLE, audio_path=inputs["narration"], bgm_path=inputs["bgm"], save_path=save_path,
+            renderer="ffmpeg", encoder="publish", hold_static=hold,
+        )
+    else:
+        n_static = round(SEGMENTS * static_ratio)
+        motions = ["static"] * n_static + ["zoom_in_out", "left_to_right", "right_to_left"] * SEGMENTS
+        subtitles = renderer == "subtitles"
+        segments_path = os.path.join(work_dir, f"segments_{'hold' if hold else 'cfr'}.mp4") if subtitles else save_path
+
+        def render():
+            vm.create_video_with_segments(
+                list(inputs["images"]), inputs["segments"], inputs["narration"], TITLE, bgm_path=inputs["bgm"],
+                save_path=segments_path, renderer="ffmpeg" if subtitles else renderer, encoder="publish",
+                motions=motions[:SEGMENTS], hold_static=hold,
+            )
+            if subtitles:
+                vm.add_subtitles_to_video(segments_path, inputs["ass"], output_path=save_path, encoder="publish",
+                                          hold_static=hold)
+
+    child_before = resource.getrusage(resource.RUSAGE_CHILDREN)
+    t0 = time.perf_counter()
+    render()
+    wall = time.perf_counter() - t0
+    child_after = resource.getrusage(resource.RUSAGE_CHILDREN)
+    packets, video_duration = packet_stats(save_path)
+    return {
+        "renderer": renderer,
+        "hold": hold,
+        "wall_s": round(wall, 3),
+        "child_cpu_s": round(child_after.ru_utime - child_before.ru_utime
+                             + child_after.ru_stime - child_before.ru_stime, 3),
+        "size_kb": round(os.path.getsize(save_path) / 1024, 1),
+        "encoded_frames": packets,
+        "decoded_frames": decoded_frames(save_path),
+        "video_duration_s": round(video_duration, 3),
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(description="VFR hold vs CFR render benchmark")
+    ap.add_argument("--renderers", nargs="+", choices=RENDERERS, default=RENDERERS)
+    ap.add_argument("--static-ratio", type=float, default=STATIC_RATIO, help="static 세그먼트 비율 (0~1)")
+    ap.add_argument("--seed", type=int, default=0, help="세그먼트 길이 난수 시드")
+    ap.add_argument("--output", help="결과 JSON 저장 경로 (기본: 표준출력)")
+    args = ap.parse_args()
+
+    results, mismatched = [], []
+    with tempfile.TemporaryDirectory(prefix="bench_vfr_") as work_dir:
+        segments = make_uneven_segments(SEGMENTS, random.Random(args.seed))
+        duration = segments[-1]["end"]
+        inputs = {
+            "segments": segments,
+            "ass": os.path.join(work_dir, "subtitle.ass"),
+            "images": make_images(work_dir, (1280, 853), 4),
+            "narration": make_tone(os.path.join(work_dir, "narration.mp3"), duration, 440),
+            "bgm": make_tone(os.path.join(work_dir, "bgm.mp3"), 7.0, 220),
+        }
+        if "subtitles" in args.renderers:
+            from generate_timed_segments import generate_ass_subtitle
+            generate_ass_subtitle(segments, inputs["ass"])
+        for renderer in args.renderers:
+            pair = [run_case(renderer, hold, work_dir, inputs, args.static_ratio) for hold in (False, True)]
+            cfr, held = pair
+            print(f"⏱️ {renderer}: {cfr['wall_s']}s -> {held['wall_s']}s, "
+                  f"{cfr['size_kb']}KB -> {held['size_kb']}KB, "
+                  f"frames {cfr['encoded_frames']} -> {held['encoded_frames']}", file=sys.stderr)
+            # 버린 프레임 자리는 앞 프레임이 채워야 하므로 24fps 타임라인/재생 길이/화면이 CFR과 같아야 함
+            held["min_psnr"] = round(min_psnr(case_path(work_dir, renderer, False), case_path(work_dir, renderer, True)), 2)
+            same = (held["decoded_frames"] == cfr["decoded_frames"]
+                    and abs(held["video_duration_s"] - cfr["video_duration_s"]) < 0.5 / FPS
+                    and held["min_psnr"] >= MIN_PSNR)
+            if not same:
+                mismatched.append(renderer)
+            print(f"{'✅' if same else '❌'} {renderer}: decoded {cfr['decoded_frames']} / {held['decoded_frames']} frames, "
+                  f"{cfr['video_duration_s']:.2f}s / {held['video_duration_s']:.2f}s (cfr / hold), "
+                  f"min PSNR {held['min_psnr']}dB", file=sys.stderr)
+            results += pair
+
+    report = {
+        "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "segments": SEGMENTS,
+        "static_ratio": args.static_ratio,
+        "seed": args.seed,
+        "results": results,
+        "mismatched": mismatched,
+    }
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+    else:
+        print(text)
+    if mismatched:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+# 한 프로세스에서 영상을 N번 렌더링하면서 RSS / 열린 fd / 자식 프로세스 수가 평평한지 확인 (Linux /proc 기반)
+# 오래 도는 워커에서 클립(오디오 리더 등)을 닫지 않아 생기는 누수를 잡기 위한 점검용. 누수면 exit 1.
+# 순환 GC 가 뒤늦게 __del__ 로 정리해 주는 것에 기대지 않도록 기본으로 gc 를 끈 채 측정한다 (--gc 로 켬).
+#
+#   python benchmarks/check_leaks.py
+#   python benchmarks/check_leaks.py --renders 20 --renderer ffmpeg --rss-slack-mb 40
+import os, sys, gc, json, argparse, tempfile, contextlib, io
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from bench_render import make_images, make_tone, make_segments, SCRIPT_TEXT, TITLE
+
+WARMUP = 2  # 첫 렌더들은 폰트/코덱/이미지 캐시 적재로 늘어나므로 기준에서 제외
+RSS_SLACK_MB = 30  # 워밍업 이후 허용하는 RSS 증가폭
+
+
+def rss_mb():
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def open_fds():
+    return len(os.listdir("/proc/self/fd"))
+
+
+def child_processes():
+    """아직 살아 있는(좀비 포함) 직계 자식 프로세스 수"""
+    me = str(os.getpid())
+    count = 0
+    for pid in os.listdir("/proc"):
+        if not pid.isdigit():
+            continue
+        try:
+            with open(f"/proc/{pid}/stat") as f:
+                # comm 에 공백이 있을 수 있으므로 마지막 ')' 뒤에서 필드를 센다
+                fields = f.read().rsplit(")", 1)[1].split()
+        except OSError:
+            continue
+        if fields[1] == me:
+            count += 1
+    return count
+
+
+def snapshot():
+    return {"rss_mb": round(rss_mb(), 1), "fds": open_fds(), "children": child_processes()}
+
+
+def main():
+    ap = argparse.ArgumentParser(description="clip resource leak check for video_maker")
+    ap.add_argument("--renders", type=int, default=10, help="렌더 횟수 (경로마다)")
+    ap.add_argument("--renderer", default="moviepy", help="video_maker renderer (기본: moviepy)")
+    ap.add_argument("--rss-slack-mb", type=float, default=RSS_SLACK_MB)
+    ap.add_argument("--gc", action="store_true", help="순환 GC를 켠 채로 측정")
+    args = ap.parse_args()
+    if not args.gc:
+        gc.disable()
+
+    import video_maker as vm
+
+    with tempfile.TemporaryDirectory(prefix="check_leaks_") as work_dir:
+        images = make_images(work_dir, (1280, 853), 2)
+        narration = make_tone(os.path.join(work_dir, "narration.mp3"), 2.0, 440)
+        bgm = make_tone(os.path.join(work_dir, "bgm.mp3"), 1.5, 220)
+        save_path = os.path.join(work_dir, "out.mp4")
+
+        renders = {
+            "segments": lambda: vm.create_video_with_segments(
+                list(images), make_segments(2)[:2], narration, TITLE, bgm_path=bgm, save_path=save_path,
+                renderer=args.renderer, encoder="draft", motions=["static", "left_to_right"],
+            ),
+            "dark_text": lambda: vm.create_dark_text_video(
+                SCRIPT_TEXT, TITLE, audio_path=narration, bgm_path=bgm, save_path=save_path,
+                renderer=args.renderer, encoder="draft",
+            ),
+        }
+
+        report, failed = {}, False
+        for name, render in renders.items():
+            samples = []
+            for _ in range(args.renders):
+                with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+                    render()
+                samples.append(snapshot())
+            base, last = samples[min(WARMUP, len(samples) - 1)], samples[-1]
+            growth = {k: round(last[k] - base[k], 1) for k in base}
+            ok = growth["fds"] <= 0 and growth["children"] <= 0 and growth["rss_mb"] <= args.rss_slack_mb
+            failed |= not ok
+            report[name] = {"samples": samples, "growth_after_warmup": growth, "ok": ok}
+            print(f"{'✅' if ok else '❌'} {name}: fds +{growth['fds']}, children +{growth['children']}, "
+                  f"rss +{growth['rss_mb']}MB ({args.renders}회)", file=sys.stderr)
+
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
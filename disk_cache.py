@@ -0,0 +1,137 @@
+import os
+import shutil
+import hashlib
+import tempfile
+import threading
+
+# 내용 주소 기반 디스크 캐시 (assets/cache/ 아래)
+# 키 -> 파일 하나. 원자적으로 쓰고(임시 파일 + os.replace), 읽을 때 mtime을 갱신해서
+# 용량 상한을 넘으면 가장 오래 안 쓴 파일부터 지운다(LRU).
+# 전체 용량은 메모리에 누적해 두고(처음 한 번만 폴더를 훑어 초기화) 상한을 넘었을 때만 폴더를 다시 훑는다.
+# 다른 프로세스가 같은 폴더에 쓴 양은 다음 정리 때 다시 훑으면서 맞춰진다.
+
+CACHE_ROOT = os.path.join("assets", "cache")
+PRUNE_TO = 0.9  # 상한을 넘으면 상한의 90%까지 지움 (상한 근처에서 put 마다 폴더를 훑지 않도록)
+
+_digest_memo = {}
+
+
+def file_digest(path, chunk_size=1 << 20):
+    """파일 내용 sha256. (경로, 크기, mtime)이 같으면 다시 읽지 않는다."""
+    st = os.stat(path)
+    memo_key = (os.path.abspath(path), st.st_size, st.st_mtime_ns)
+    digest = _digest_memo.get(memo_key)
+    if digest is None:
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(chunk_size), b""):
+                h.update(chunk)
+        digest = h.hexdigest()
+        _digest_memo[memo_key] = digest
+    return digest
+
+
+def key_digest(*parts):
+    """여러 키 조각(문자열/숫자)을 하나의 sha256 키로"""
+    h = hashlib.sha256()
+    for p in parts:
+        h.update(repr(p).encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+class DiskCache:
+    def __init__(self, name, max_bytes, root=CACHE_ROOT):
+        self.dir = os.path.join(root, name)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._total = None  # 캐시 파일 전체 크기 (None: 아직 안 훑음)
+        self._lock = threading.Lock()
+
+    def path_for(self, key, suffix=""):
+        return os.path.join(self.dir, key[:2], key + suffix)
+
+    def get(self, key, suffix=""):
+        """캐시 파일 경로 (없으면 None). 히트하면 LRU 순서를 위해 mtime 갱신."""
+        path = self.path_for(key, suffix)
+        if os.path.exists(path):
+            try:
+                os.utime(path)
+            except OSError:
+                pass
+            self.hits += 1
+            return path
+        self.misses += 1
+        return None
+
+    def put(self, key, suffix, write):
+        """write(tmp_path)로 임시 파일을 채운 뒤 원자적으로 캐시에 넣고 경로를 돌려준다."""
+        path = self.path_for(key, suffix)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp" + suffix)
+        os.close(fd)
+        try:
+            write(tmp_path)
+            size = os.path.getsize(tmp_path)
+            replaced = os.path.getsize(path) if os.path.exists(path) else 0
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        self._add(size - replaced)
+        return path
+
+    def put_file(self, key, suffix, src_path):
+        """이미 만들어진 파일을 캐시에 복사해 넣는다."""
+        return self.put(key, suffix, lambda tmp: shutil.copyfile(src_path, tmp))
+
+    def _add(self, delta):
+        """누적 용량에 delta 바이트 반영. 상한을 넘었을 때만 prune (폴더 훑기)"""
+        if not self.max_bytes:
+            return
+        with self._lock:
+            if self._total is None:
+                self._total = self._scan()[1]  # 방금 넣은 파일까지 포함된 값
+            else:
+                self._total += delta
+            if self._total > self.max_bytes:
+                self._prune_locked()
+
+    def _scan(self):
+        """(캐시 파일 [(mtime, 크기, 경로), ...], 전체 크기)"""
+        entries = []
+        total = 0
+        for dirpath, _, filenames in os.walk(self.dir):
+            for fn in filenames:
+                if ".tmp" in fn:
+                    continue
+                p = os.path.join(dirpath, fn)
+                try:
+                    st = os.stat(p)
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, p))
+                total += st.st_size
+        return entries, total
+
+    def prune(self):
+        """용량 상한을 넘으면 오래 안 쓴 파일부터 삭제"""
+        if not self.max_bytes:
+            return
+        with self._lock:
+            self._prune_locked()
+
+    def _prune_locked(self):
+        entries, total = self._scan()
+        if total > self.max_bytes:
+            target = self.max_bytes * PRUNE_TO
+            for _, size, p in sorted(entries):
+                try:
+                    os.remove(p)
+                except OSError:
+                    continue
+                total -= size
+                if total <= target:
+                    break
+        self._total = total
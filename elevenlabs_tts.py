@@ -1,21 +1,85 @@
 import requests
 import os
+import json
+import base64
+import threading
+from xml.sax.saxutils import escape as xml_escape
 import boto3 # Import the boto3 library for AWS services
+from botocore.config import Config
+from botocore.exceptions import ClientError
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 ELEVEN_API_KEY = os.getenv("ELEVEN_API_KEY", "")
 AWS_ACCESS_KEY_ID = os.getenv("AWS_ACCESS_KEY_ID", "")
 AWS_SECRET_ACCESS_KEY = os.getenv("AWS_SECRET_ACCESS_KEY", "")
 AWS_REGION = os.getenv("AWS_REGION", "ap-northeast-2")
+ELEVEN_API_BASE = os.getenv("ELEVEN_API_BASE", "https://api.elevenlabs.io")
+POLLY_ENDPOINT_URL = os.getenv("POLLY_ENDPOINT_URL") or None  # 로컬 스텁/프록시용 (없으면 AWS 기본)
+
+# HTTP 연결 풀 / 타임아웃 / 재시도 정책
+# 라인마다 새 TCP+TLS 연결을 맺지 않도록 keep-alive 풀을 공유하고, 응답이 멈춘 요청이 잡 전체를 붙잡지 않게
+# 연결/읽기 타임아웃을 둔다. 연결 오류/5xx는 세션에서 지수 백오프 + jitter로 재시도.
+# 429는 여기서 재시도하지 않고 TTSRateLimitError로 올려서 generate_timed_segments._with_backoff 가
+# 프로바이더 동시 요청 슬롯을 놓은 상태에서 Retry-After만큼 기다리게 한다 (재시도 계층이 곱해지지 않도록 한 곳에서만).
+TTS_POOL_SIZE = 10                 # generate_tts_per_line 동시 요청 상한(TTS_MAX_CONCURRENCY)보다 크게
+TTS_CONNECT_TIMEOUT = 5            # 초
+TTS_READ_TIMEOUT = 60              # 초 (긴 문장 합성 대기 포함)
+TTS_HTTP_RETRIES = 3
+TTS_RETRY_BACKOFF = 0.5            # 0.5, 1, 2초 ... + jitter
+TTS_RETRY_JITTER = 0.5
+TTS_RETRY_STATUS = (500, 502, 503, 504)
+TTS_STREAM_CHUNK = 16 * 1024       # 스트리밍 모드에서 한 번에 받아 쓰는 바이트 수
+
+# 429 / 스로틀링 응답 (잠시 후 재시도하면 되는 오류). retry_after: 서버가 알려준 대기 시간(초, 없으면 None)
+class TTSRateLimitError(RuntimeError):
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+POLLY_THROTTLE_CODES = ("ThrottlingException", "TooManyRequestsException", "ServiceQuotaExceededException")
 
 # Initialize Amazon Polly client
-# This client will be reused for Polly TTS requests.
+# This client will be reused for Polly TTS requests (boto3 클라이언트는 스레드 간 공유 가능).
+# standard 재시도 모드: 스로틀링/5xx를 지수 백오프 + jitter로 재시도
 polly_client = boto3.client(
     'polly',
     aws_access_key_id=AWS_ACCESS_KEY_ID,
     aws_secret_access_key=AWS_SECRET_ACCESS_KEY,
-    region_name=AWS_REGION
+    region_name=AWS_REGION,
+    endpoint_url=POLLY_ENDPOINT_URL,
+    config=Config(
+        max_pool_connections=TTS_POOL_SIZE,
+        connect_timeout=TTS_CONNECT_TIMEOUT,
+        read_timeout=TTS_READ_TIMEOUT,
+        retries={"max_attempts": TTS_HTTP_RETRIES + 1, "mode": "standard"},
+    ),
 )
 
+_session = None
+_session_lock = threading.Lock()
+
+def get_http_session():
+    """ElevenLabs 요청용 공유 requests.Session (keep-alive 연결 풀 + 연결 오류/5xx 재시도)"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            retry = Retry(
+                total=TTS_HTTP_RETRIES,
+                backoff_factor=TTS_RETRY_BACKOFF,
+                backoff_jitter=TTS_RETRY_JITTER,
+                status_forcelist=TTS_RETRY_STATUS,
+                allowed_methods=frozenset({"POST"}),  # TTS POST는 같은 입력이면 같은 결과라 재시도해도 안전
+                respect_retry_after_header=False,  # 서버가 정한 대기는 슬롯 밖의 _with_backoff 몫
+                raise_on_status=False,  # 재시도를 다 써도 마지막 응답을 그대로 돌려받아 아래에서 판정
+            )
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=TTS_POOL_SIZE, max_retries=retry)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _session = session
+        return _session
+
 # ElevenLabs TTS Templates (unchanged from your original code)
 TTS_ELEVENLABS_TEMPLATES = {
     "educational": {
@@ -76,6 +140,10 @@ TTS_ELEVENLABS_TEMPLATES = {
     }
 }
 
+ELEVEN_MODEL_ID = "eleven_multilingual_v2"
+POLLY_ENGINE = "neural"
+POLLY_DEFAULT_VOICE = "Seoyeon"
+
 # Amazon Polly Voice Mappings
 # Amazon Polly uses VoiceIds. We can map descriptive names to these IDs.
 TTS_POLLY_VOICES = {
@@ -95,11 +163,9 @@ TTS_POLLY_VOICES = {
     # 필요에 따라 더 많은 언어/성별 조합 추가 가능
 }
 
-def generate_elevenlabs_tts(text, save_path, template_name, voice_id):
-    """
-    Generates speech using ElevenLabs API.
-    This is the original generate_tts logic, refactored into a private helper function.
-    """
+def _elevenlabs_post(text, template_name, voice_id, endpoint="", stream=False):
+    """ElevenLabs TTS 요청 (endpoint="/with-timestamps"면 음성 + 글자별 타임스탬프 JSON). 200 응답을 돌려준다.
+    stream=True면 본문을 받지 않은 채로 돌려준다 (iter_content로 읽기)."""
     settings = TTS_ELEVENLABS_TEMPLATES.get(template_name, TTS_ELEVENLABS_TEMPLATES["default"])
 
     # voice_id가 주어지지 않으면 템플릿의 voice_id 사용
@@ -112,7 +178,7 @@ def generate_elevenlabs_tts(text, save_path, template_name, voice_id):
 
     data = {
         "text": text,
-        "model_id": "eleven_multilingual_v2",
+        "model_id": ELEVEN_MODEL_ID,
         "voice_settings": {
             "stability": settings["stability"],
             "similarity_boost": settings["similarity_boost"],
@@ -121,47 +187,169 @@ def generate_elevenlabs_tts(text, save_path, template_name, voice_id):
         }
     }
 
-    response = requests.post(
-        f"https://api.elevenlabs.io/v1/text-to-speech/{voice_id}",
+    response = get_http_session().post(
+        f"{ELEVEN_API_BASE}/v1/text-to-speech/{voice_id}{endpoint}",
         headers=headers,
-        json=data
+        json=data,
+        timeout=(TTS_CONNECT_TIMEOUT, TTS_READ_TIMEOUT),
+        stream=stream,
     )
 
-    if response.status_code == 200:
-        os.makedirs(os.path.dirname(save_path), exist_ok=True)
-        with open(save_path, "wb") as f:
-            f.write(response.content)
-        print(f"✅ ElevenLabs 음성 저장 완료: {save_path}")
-        return save_path
-    else:
+    if response.status_code == 429:
+        retry_after = response.headers.get("Retry-After")
+        raise TTSRateLimitError(f"ElevenLabs TTS 요청 한도 초과: {response.status_code} {response.text}",
+                                retry_after=float(retry_after) if retry_after and retry_after.isdigit() else None)
+    if response.status_code != 200:
         raise RuntimeError(f"ElevenLabs TTS 생성 실패: {response.status_code} {response.text}")
+    return response
+
+def _write_audio(save_path, data):
+    os.makedirs(os.path.dirname(save_path) or ".", exist_ok=True)
+    with open(save_path, "wb") as f:
+        f.write(data)
+
+def generate_elevenlabs_tts(text, save_path, template_name, voice_id):
+    """
+    Generates speech using ElevenLabs API.
+    This is the original generate_tts logic, refactored into a private helper function.
+    """
+    response = _elevenlabs_post(text, template_name, voice_id)
+    _write_audio(save_path, response.content)
+    print(f"✅ ElevenLabs 음성 저장 완료: {save_path}")
+    return save_path
+
+def _polly_synthesize(**kwargs):
+    """polly_client.synthesize_speech + 오류 변환 (스로틀링은 TTSRateLimitError). AudioStream 바이트를 돌려준다."""
+    return _polly_audio_stream(**kwargs).read()
+
+def _polly_audio_stream(**kwargs):
+    """_polly_synthesize와 같지만 AudioStream(StreamingBody)을 읽지 않고 돌려준다."""
+    try:
+        response = polly_client.synthesize_speech(Engine=POLLY_ENGINE, **kwargs)
+    except ClientError as e:
+        if e.response.get("Error", {}).get("Code") in POLLY_THROTTLE_CODES:
+            raise TTSRateLimitError(f"Amazon Polly TTS 요청 한도 초과: {e}") from e
+        raise RuntimeError(f"Amazon Polly TTS 생성 실패: {e}")
+    except Exception as e:
+        raise RuntimeError(f"Amazon Polly TTS 생성 실패: {e}")
+    if "AudioStream" not in response:
+        raise RuntimeError("Amazon Polly TTS 생성 실패: AudioStream not found in response.")
+    return response["AudioStream"]
 
 def generate_polly_tts(text, save_path, polly_voice_name_key):
     """
     Generates speech using Amazon Polly.
     """
-    # Determine the VoiceId from the mapping, defaulting to Matthew if key not found
-    voice_id = TTS_POLLY_VOICES.get(polly_voice_name_key, "Seoyeon")
+    # Determine the VoiceId from the mapping, defaulting to Seoyeon if key not found
+    voice_id = TTS_POLLY_VOICES.get(polly_voice_name_key, POLLY_DEFAULT_VOICE)
+    audio = _polly_synthesize(Text=text, OutputFormat='mp3', VoiceId=voice_id)
+    _write_audio(save_path, audio)
+    print(f"✅ Amazon Polly 음성 저장 완료: {save_path}")
+    return save_path
+
+# ===== 스트리밍 합성 =====
+# 응답 본문 전체를 메모리에 받은 뒤 쓰지 않고, 청크가 올 때마다 파일에 쓰고 알린다 (메모리는 청크 하나 분량).
+#   ElevenLabs: /stream 엔드포인트 (청크 전송), Polly: AudioStream.iter_chunks
+def stream_tts_to_file(text, save_path, provider, template_name="default", voice_id=None,
+                       polly_voice_name_key="korean_female1", on_progress=None):
+    """
+    text를 스트리밍으로 합성하며 받는 대로 save_path에 쓴다. 청크를 쓸 때마다 on_progress(지금까지 쓴 바이트 수) 호출
+    (다른 스레드가 파일을 따라 읽을 수 있도록 flush 후 호출). 요청 한도 초과는 첫 바이트 전에 TTSRateLimitError.
+    """
+    if provider == "elevenlabs":
+        response = _elevenlabs_post(text, template_name, voice_id, endpoint="/stream", stream=True)
+        chunks, close = response.iter_content(chunk_size=TTS_STREAM_CHUNK), response.close
+    elif provider == "polly":
+        voice = TTS_POLLY_VOICES.get(polly_voice_name_key, POLLY_DEFAULT_VOICE)
+        body = _polly_audio_stream(Text=text, OutputFormat='mp3', VoiceId=voice)
+        chunks, close = body.iter_chunks(TTS_STREAM_CHUNK), body.close
+    else:
+        raise ValueError(f"Unsupported TTS provider: {provider}. Choose 'elevenlabs' or 'polly'.")
 
     try:
-        response = polly_client.synthesize_speech(
-            Text=text,
-            OutputFormat='mp3', # Output format as MP3
-            VoiceId=voice_id, # Selected voice ID
-            Engine='neural' # Use neural engine for better quality, if available for the voice
-        )
-
-        if "AudioStream" in response:
-            os.makedirs(os.path.dirname(save_path), exist_ok=True)
-            with open(save_path, 'wb') as file:
-                file.write(response['AudioStream'].read()) # Write audio stream to file
-            print(f"✅ Amazon Polly 음성 저장 완료: {save_path}")
-            return save_path
-        else:
-            raise RuntimeError("Amazon Polly TTS 생성 실패: AudioStream not found in response.")
+        os.makedirs(os.path.dirname(save_path) or ".", exist_ok=True)
+        written = 0
+        with open(save_path, "wb") as f:
+            for chunk in chunks:
+                if not chunk:
+                    continue
+                f.write(chunk)
+                f.flush()
+                written += len(chunk)
+                if on_progress:
+                    on_progress(written)
+    finally:
+        close()
+    if not written:
+        raise RuntimeError(f"TTS 스트림이 비어 있습니다: {save_path}")
+    return save_path
 
-    except Exception as e:
-        raise RuntimeError(f"Amazon Polly TTS 생성 실패: {e}")
+# ===== 스크립트 전체를 한 번에 합성 + 라인별 시작 시각 =====
+# 라인마다 요청하지 않고 전체 스크립트를 한 요청으로 보내고, 프로바이더 정렬 정보로 라인 경계를 찾는다.
+#   ElevenLabs: /with-timestamps 의 글자별 시작/끝 시각
+#   Polly: 라인 앞에 SSML <mark>를 넣고 speech marks(ssml)로 마크 시각 조회 (음성 + 마크 2회 요청)
+ELEVEN_BATCH_MAX_CHARS = 5000   # 한 요청 글자 수 상한 (넘으면 호출 측에서 라인별로 폴백)
+POLLY_BATCH_MAX_CHARS = 3000    # Polly 과금 글자 수 상한 (SSML 태그 제외)
+BATCH_LINE_JOINER = " "
+
+def _line_starts_from_alignment(lines, alignment):
+    """글자 정렬(characters, character_start_times_seconds)에서 각 라인 첫 글자의 시작 시각(초)"""
+    chars = alignment["characters"]
+    starts = alignment["character_start_times_seconds"]
+    spoken = "".join(chars)
+    if len(spoken) != len(chars):
+        raise RuntimeError("ElevenLabs 정렬 정보 형식이 예상과 다릅니다 (글자 단위가 아님).")
+    line_starts, cursor = [], 0
+    for line in lines:
+        idx = spoken.find(line.strip(), cursor)
+        if idx < 0:
+            raise RuntimeError(f"ElevenLabs 정렬 정보에서 라인을 찾지 못했습니다: '{line[:30]}...'")
+        line_starts.append(float(starts[idx]))
+        cursor = idx + len(line.strip())
+    return line_starts
+
+def generate_elevenlabs_tts_with_timestamps(lines, save_path, template_name, voice_id):
+    text = BATCH_LINE_JOINER.join(l.strip() for l in lines)
+    if len(text) > ELEVEN_BATCH_MAX_CHARS:
+        raise ValueError(f"스크립트가 너무 깁니다 ({len(text)}자 > {ELEVEN_BATCH_MAX_CHARS}자).")
+    payload = _elevenlabs_post(text, template_name, voice_id, endpoint="/with-timestamps").json()
+    line_starts = _line_starts_from_alignment(lines, payload["alignment"])
+    _write_audio(save_path, base64.b64decode(payload["audio_base64"]))
+    print(f"✅ ElevenLabs 전체 스크립트 음성 저장 완료: {save_path} ({len(lines)}줄, 1회 요청)")
+    return line_starts
+
+def generate_polly_tts_with_marks(lines, save_path, polly_voice_name_key):
+    if sum(len(l) for l in lines) > POLLY_BATCH_MAX_CHARS:
+        raise ValueError(f"스크립트가 너무 깁니다 (> {POLLY_BATCH_MAX_CHARS}자).")
+    voice_id = TTS_POLLY_VOICES.get(polly_voice_name_key, POLLY_DEFAULT_VOICE)
+    ssml = "<speak>" + BATCH_LINE_JOINER.join(
+        f'<mark name="{i}"/>{xml_escape(l.strip())}' for i, l in enumerate(lines)) + "</speak>"
+    marks_raw = _polly_synthesize(Text=ssml, TextType="ssml", OutputFormat="json", SpeechMarkTypes=["ssml"],
+                                  VoiceId=voice_id)
+    marks = {}
+    for row in marks_raw.decode("utf-8").splitlines():
+        if row.strip():
+            mark = json.loads(row)
+            marks[mark["value"]] = mark["time"] / 1000.0
+    if len(marks) != len(lines):
+        raise RuntimeError(f"Polly speech marks 수가 라인 수와 다릅니다 ({len(marks)} != {len(lines)}).")
+    audio = _polly_synthesize(Text=ssml, TextType="ssml", OutputFormat="mp3", VoiceId=voice_id)
+    _write_audio(save_path, audio)
+    print(f"✅ Amazon Polly 전체 스크립트 음성 저장 완료: {save_path} ({len(lines)}줄, 2회 요청)")
+    return [marks[str(i)] for i in range(len(lines))]
+
+def generate_tts_with_timestamps(lines, save_path, provider, template_name="default", voice_id=None,
+                                 polly_voice_name_key="korean_female1"):
+    """
+    lines 전체를 한 번에 합성해 save_path에 저장하고, 각 라인이 시작하는 시각(초) 목록을 돌려준다.
+    한도를 넘는 스크립트는 ValueError, 정렬 정보를 라인에 맞추지 못하면 RuntimeError (호출 측에서 라인별로 폴백).
+    """
+    if provider == "elevenlabs":
+        return generate_elevenlabs_tts_with_timestamps(lines, save_path, template_name, voice_id)
+    elif provider == "polly":
+        return generate_polly_tts_with_marks(lines, save_path, polly_voice_name_key)
+    else:
+        raise ValueError(f"Unsupported TTS provider: {provider}. Choose 'elevenlabs' or 'polly'.")
 
 def generate_tts(text, save_path="assets/audio.mp3", provider="Amazon Polly", template_name="default", voice_id=None, polly_voice_name_key="korean_female1"):
     """
@@ -0,0 +1,61 @@
+# 인코더 프로파일
+# 파이프라인의 모든 인코딩(moviepy write_videofile / ffmpeg 렌더러 / 자막 굽기 패스)이
+# 같은 preset, CRF, 스레드 수, 출력 해상도를 쓰도록 이름으로 묶어 둔다.
+# job_config.yaml 의 encoder_profile 로 잡마다 선택 (없으면 기존 x264 기본값 그대로).
+#
+#   publish : 업로드용 화질 우선
+#   fast    : 처리량 우선 (veryfast)
+#   draft   : QA용 360p 미리보기 (ultrafast, 레이아웃은 720x1080 기준으로 만든 뒤 축소)
+
+ENCODER_PROFILES = {
+    "publish": {"preset": "slow", "crf": 20, "threads": 0, "width": 720, "height": 1080},
+    "fast": {"preset": "veryfast", "crf": 23, "threads": 0, "width": 720, "height": 1080},
+    "draft": {"preset": "ultrafast", "crf": 30, "threads": 0, "width": 240, "height": 360},
+}
+
+
+def get_encoder_profile(profile):
+    """프로파일 이름(또는 dict, None)을 설정 dict로. None이면 None (기존 기본값 사용)."""
+    if profile is None or isinstance(profile, dict):
+        return profile
+    if profile not in ENCODER_PROFILES:
+        raise ValueError(f"Unsupported encoder profile: {profile}. Choose one of {', '.join(ENCODER_PROFILES)}.")
+    return ENCODER_PROFILES[profile]
+
+
+def x264_args(profile, threads=None):
+    """ffmpeg 명령줄용 -preset/-crf/-threads 인자. threads를 주면 프로파일 값 대신 사용."""
+    profile = get_encoder_profile(profile)
+    if profile is None:
+        return ["-threads", str(threads)] if threads else []
+    return [
+        "-preset", profile["preset"],
+        "-crf", str(profile["crf"]),
+        "-threads", str(threads if threads else profile["threads"]),
+    ]
+
+
+def scale_filter(profile, width, height):
+    """프로파일 해상도가 레이아웃 크기(width x height)와 다르면 축소 필터, 같으면 None.
+    width/height를 모르면(None) 프로파일이 있는 한 항상 프로파일 해상도로 맞춘다."""
+    profile = get_encoder_profile(profile)
+    if profile is None or (profile["width"], profile["height"]) == (width, height):
+        return None
+    return f"scale={profile['width']}:{profile['height']}:flags=bicubic"
+
+
+def moviepy_write_options(profile, width, height, video_filters=()):
+    """moviepy write_videofile 에 넘길 preset/threads/ffmpeg_params (video_filters 뒤에 축소 필터)"""
+    profile = get_encoder_profile(profile)
+    filters = [f for f in video_filters if f]
+    scale = scale_filter(profile, width, height)
+    if scale:
+        filters.append(scale)
+    params = ["-crf", str(profile["crf"])] if profile else []
+    if filters:
+        params += ["-vf", ",".join(filters)]
+    options = {"ffmpeg_params": params or None}
+    if profile:
+        options["preset"] = profile["preset"]
+        options["threads"] = profile["threads"] or None
+    return options
@@ -0,0 +1,527 @@
+import os
+import subprocess
+import tempfile
+import concurrent.futures
+import imageio_ffmpeg
+from PIL import Image
+from encoder_profiles import x264_args, scale_filter
+import numpy as np
+from motion_engine import (
+    ZOOM_START_SCALE, ZOOM_END_SCALE, PAN_START_RATIO, PAN_END_RATIO, PAN_MIN_MOVE, cover_dims,
+    MotionSource,
+)
+
+# ffmpeg 필터 그래프 기반 렌더러
+# moviepy가 프레임마다 파이썬에서 합성하던 작업(모션/타이틀바/BGM 믹싱)을
+# 하나의 filter_complex로 컴파일해서 ffmpeg 프로세스 하나로 디코딩~인코딩을 끝낸다.
+
+ffmpeg_path = imageio_ffmpeg.get_ffmpeg_exe()
+
+FPS = 24
+AUDIO_FPS = 44100
+BGM_VOLUME = 0.2
+HOLD_REFRESH_FRAMES = 48  # 고정 구간에서도 이 간격(2초)마다 프레임을 하나씩 남겨 탐색 호환 유지
+
+FONTS_DIR = os.path.abspath(os.path.join("assets", "fonts"))
+
+
+def ass_filter(ass_path, fonts_dir=FONTS_DIR):
+    """ASS 자막을 프레임에 굽는 ffmpeg 필터 (add_subtitles_to_video 와 동일한 설정)"""
+    return f"ass={ass_path}:fontsdir={fonts_dir}"
+
+
+def cover_size(img_path, width, height):
+    """이미지가 화면을 가득 덮는 '커버' 리사이즈 크기 (create_motion_clip과 동일한 반올림)"""
+    with Image.open(img_path) as im:
+        return cover_dims(im.width, im.height, width, height)
+
+
+def frame_counts(segments, fps=FPS):
+    """세그먼트별 프레임 수. 누적 경계를 반올림해서 길이가 길어져도 싱크가 밀리지 않게 한다."""
+    counts = []
+    elapsed = 0.0
+    prev_boundary = 0
+    for seg in segments:
+        elapsed += seg['end'] - seg['start']
+        boundary = round(elapsed * fps)
+        counts.append(max(1, boundary - prev_boundary))
+        prev_boundary = boundary
+    return counts
+
+
+def held_select(spans, refresh=HOLD_REFRESH_FRAMES):
+    """고정 구간 [(시작 프레임, 프레임 수), ...] 안의 중복 프레임을 버리는 select 필터 (없으면 None).
+    구간의 첫 두 프레임/마지막 프레임과 refresh 간격 프레임만 남기고, 버린 자리는 -fps_mode vfr 출력에서
+    앞 프레임이 그만큼 길게 표시(hold)된다."""
+    # 구간 시작 프레임은 세그먼트 시작 시각을 반올림한 것이라 자막 시작보다 최대 반 프레임 이를 수 있음
+    # -> 두 번째 프레임까지 남겨 두면 나중에 자막을 구워도(add_subtitles_to_video) CFR 과 같은 프레임에서 바뀐다
+    terms = [
+        f"between(n,{start + 2},{start + count - 2})*gt(mod(n-{start},{refresh}),0)"
+        for start, count in spans if count >= 4
+    ]
+    if not terms:
+        return None
+    # loop/setpts=N 으로 만든 프레임은 길이(duration)가 비어 있어서 VFR 출력의 마지막 프레임이 0초로 기록됨
+    # -> 앞에서 fps 로 프레임마다 1/FPS 길이를 채우고, 출력 타임베이스를 프레임 단위로 고정해
+    #    VFR mp4 의 프레임 길이(마지막 hold 포함)가 정확히 기록되게 한다
+    return f"fps={FPS},select='not({'+'.join(terms)})',settb=1/{FPS}"
+
+
+def frame_rate_args(hold):
+    """출력 프레임레이트 인자. hold면 타임스탬프를 그대로 쓰는 VFR, 아니면 24fps CFR"""
+    return ["-fps_mode", "vfr"] if hold else ["-r", str(FPS)]
+
+
+def _ease_expr(progress):
+    # ease_in_out(p) = 3p^2 - 2p^3
+    return f"(3*pow({progress},2)-2*pow({progress},3))"
+
+
+def is_static_segment(motion_type, cover_w, width):
+    """세그먼트 전체가 한 크롭인지 (static 이거나 이동 폭이 작아 고정되는 패닝)"""
+    if motion_type == "zoom_in_out":
+        return False
+    return not (motion_type in ("left_to_right", "right_to_left") and cover_w - width >= PAN_MIN_MOVE)
+
+
+def segment_filter(in_label, out_label, motion_type, cover_w, cover_h, width, height, duration, n_frames, fps=FPS):
+    """이미지 한 장 -> 세그먼트 길이만큼의 모션 클립(width x height, rgb24) 필터 체인"""
+    scale = f"[{in_label}]scale={cover_w}:{cover_h}:flags=bicubic,format=rgb24,setsar=1"
+    progress = f"(n/{fps * duration:.6f})"
+
+    # moviepy 경로와 같은 위치 계산: 이미지 좌상단 좌표(음수) -> crop 시작 좌표(양수)
+    center_x = round((width - cover_w) / 2)
+    center_y = round((height - cover_h) / 2)
+    max_move = cover_w - width
+
+    if motion_type == "zoom_in_out":
+        # 커버 이미지에서 가로 중앙/상단 기준 width x height 를 잘라낸 뒤 1.0 -> 1.05 로 줌
+        scale_diff = ZOOM_END_SCALE - ZOOM_START_SCALE
+        zoom = f"{ZOOM_START_SCALE}+{scale_diff:.4f}*on/{fps * duration:.6f}"
+        return (
+            f"{scale},crop={width}:{height}:(iw-{width})/2:0,"
+            f"zoompan=z='{zoom}':x='(iw-iw/zoom)/2':y=0:d={n_frames}:s={width}x{height}:fps={fps},"
+            # zoompan 출력 타임스탬프는 입력 pts 기준이라 다른 세그먼트처럼 프레임 번호로 다시 매김
+            # (CFR 출력에서는 -r 이 가려 주지만 VFR hold 출력에서는 그대로 드러남)
+            f"settb=1/{fps},setpts=N"
+            f"[{out_label}]"
+        )
+
+    if not is_static_segment(motion_type, cover_w, width):
+        move_distance = max_move * (PAN_END_RATIO - PAN_START_RATIO)
+        if motion_type == "left_to_right":
+            x_expr = f"{max_move * PAN_START_RATIO:.3f}-{move_distance:.3f}*{_ease_expr(progress)}"
+        else:
+            x_expr = f"{max_move * PAN_END_RATIO:.3f}+{move_distance:.3f}*{_ease_expr(progress)}"
+        return (
+            f"{scale},loop=loop={n_frames - 1}:size=1:start=0,settb=1/{fps},setpts=N,"
+            f"crop={width}:{height}:x='{x_expr}':y={-center_y}"
+            f"[{out_label}]"
+        )
+
+    # static (또는 이동 폭이 작아 고정되는 패닝): 한 번만 잘라서 프레임 복제
+    return (
+        f"{scale},crop={width}:{height}:{-center_x}:{-center_y},"
+        f"loop=loop={n_frames - 1}:size=1:start=0,settb=1/{fps},setpts=N"
+        f"[{out_label}]"
+    )
+
+
+def audio_inputs_and_filter(audio_path, bgm_path, first_input_index, duration):
+    """내레이션(없으면 무음) + BGM(무한 루프, 0.2배) 믹싱용 입력 인자와 필터 체인"""
+    args = []
+    idx = first_input_index
+    if audio_path:
+        args += ["-i", audio_path]
+    else:
+        args += ["-f", "lavfi", "-t", f"{duration:.3f}", "-i", f"anullsrc=r={AUDIO_FPS}:cl=stereo"]
+    narration_idx = idx
+    idx += 1
+
+    chains = [f"[{narration_idx}:a]aresample={AUDIO_FPS},apad[narr]"]
+    if bgm_path:
+        args += ["-stream_loop", "-1", "-i", bgm_path]
+        chains.append(f"[{idx}:a]aresample={AUDIO_FPS},volume={BGM_VOLUME}[bgm]")
+        chains.append("[narr][bgm]amix=inputs=2:duration=first:normalize=0[aout]")
+        idx += 1
+    else:
+        chains[-1] = chains[-1].replace("[narr]", "[aout]")
+    return args, chains, "aout"
+
+
+def mix_audio_track(audio_path, bgm_path, duration, save_path):
+    """내레이션(없으면 무음) + BGM 을 ffmpeg 스트리밍 필터로 믹싱해 wav로 저장 (moviepy 경로용).
+    BGM은 -stream_loop 로 반복 디코딩되므로 메모리 사용량이 BGM 길이와 무관하다."""
+    audio_args, audio_chains, audio_label = audio_inputs_and_filter(audio_path, bgm_path, 0, duration)
+    command = [
+        ffmpeg_path, "-y", "-hide_banner",
+        *audio_args,
+        "-filter_complex", ";".join(audio_chains),
+        "-map", f"[{audio_label}]",
+        "-t", f"{duration:.3f}",
+        "-c:a", "pcm_s16le",
+        save_path,
+    ]
+    subprocess.run(command, check=True)
+    return save_path
+
+
+def _save_overlay(title_overlay, tmp_dir):
+    overlay_path = os.path.join(tmp_dir, "title.png")
+    Image.fromarray(title_overlay, "RGBA").save(overlay_path)
+    return overlay_path
+
+
+def finish_video_chains(video_label, overlay_idx=None, subtitle_path=None, time_offset=0.0, scale=None):
+    """합성된 영상 위에 타이틀 오버레이/ASS 자막을 얹고 yuv420p [vout] 으로 마무리하는 체인.
+    time_offset: 영상 조각이 전체 타임라인에서 시작하는 시각(초). 자막 타이밍을 맞추는 데 사용.
+    scale: 인코더 프로파일의 출력 해상도 축소 필터 (레이아웃/자막을 다 얹은 뒤 적용)"""
+    chains = []
+    if overlay_idx is not None:
+        chains.append(f"[{video_label}][{overlay_idx}:v]overlay=0:0:format=rgb[titled]")
+        video_label = "titled"
+    if subtitle_path:
+        subs = ass_filter(subtitle_path)
+        if time_offset:
+            # ass 필터는 프레임 pts로 자막을 고르므로 잠깐 전체 타임라인 시각으로 옮겼다가 되돌림
+            subs = f"setpts=PTS+{time_offset:.6f}/TB,{subs},setpts=PTS-STARTPTS"
+        chains.append(f"[{video_label}]{subs}[subbed]")
+        video_label = "subbed"
+    chains.append(f"[{video_label}]{scale + ',' if scale else ''}format=yuv420p[vout]")
+    return chains
+
+
+def format_output_path(save_path, size):
+    """추가 출력 포맷 파일 경로: assets/video.mp4 -> assets/video_1080x1920.mp4"""
+    root, ext = os.path.splitext(save_path)
+    return f"{root}_{size[0]}x{size[1]}{ext or '.mp4'}"
+
+
+def output_targets(save_path, output_formats):
+    """[(width, height, path)]. 첫 포맷은 save_path, 나머지는 format_output_path"""
+    return [
+        (int(w), int(h), save_path if i == 0 else format_output_path(save_path, (w, h)))
+        for i, (w, h) in enumerate(output_formats)
+    ]
+
+
+def output_chains(video_label, audio_label, targets, width, height):
+    """합성 결과 한 벌을 포맷 수만큼 split/asplit 하고 포맷별로 비율 유지 축소 + 레터박스.
+    반환: (체인 목록, 포맷별 (영상 라벨, 오디오 라벨 또는 None))"""
+    n = len(targets)
+    chains = [f"[{video_label}]split={n}" + "".join(f"[vs{i}]" for i in range(n))]
+    if audio_label:
+        chains.append(f"[{audio_label}]asplit={n}" + "".join(f"[as{i}]" for i in range(n)))
+    labels = []
+    for i, (w, h, _) in enumerate(targets):
+        if (w, h) == (width, height):
+            chains.append(f"[vs{i}]null[vo{i}]")
+        else:
+            chains.append(
+                f"[vs{i}]scale={w}:{h}:force_original_aspect_ratio=decrease:flags=bicubic,"
+                f"pad={w}:{h}:(ow-iw)/2:(oh-ih)/2,setsar=1[vo{i}]"
+            )
+        labels.append((f"vo{i}", f"as{i}" if audio_label else None))
+    return chains, labels
+
+
+def output_args(video_label, audio_label, save_path, output_formats, width, height, duration, encoder,
+                video_args=(), threads=None):
+    """출력 쪽 필터 체인과 -map/인코딩 인자. output_formats가 있으면 포맷별 출력 파일을 한 번에 만든다.
+    반환: (추가 체인, 출력 인자)"""
+    if output_formats:
+        targets = output_targets(save_path, output_formats)
+        chains, labels = output_chains(video_label, audio_label, targets, width, height)
+    else:
+        targets, chains, labels = [(width, height, save_path)], [], [(video_label, audio_label)]
+
+    args = []
+    for (_, _, path), (v, a) in zip(targets, labels):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        args += ["-map", f"[{v}]"]
+        args += ["-map", f"[{a}]", "-c:a", "aac"] if a else ["-an"]
+        args += [
+            *(["-t", f"{duration:.3f}"] if duration else []),
+            *video_args,
+            "-c:v", "libx264", *x264_args(encoder, threads), "-pix_fmt", "yuv420p",
+            path,
+        ]
+    return chains, args
+
+
+def render_segments_ffmpeg(image_paths, segments, motions, audio_path=None, title_overlay=None,
+                           bgm_path=None, save_path="assets/video.mp4", width=720, height=1080,
+                           subtitle_path=None, encoder=None, output_formats=None, hold_static=False):
+    """create_video_with_segments 의 ffmpeg 백엔드. title_overlay는 RGBA numpy 배열(또는 None).
+    subtitle_path가 주어지면 같은 인코딩 안에서 ASS 자막까지 굽는다. encoder: 인코더 프로파일.
+    output_formats: [(w, h), ...] 이면 합성은 한 번만 하고 split 으로 포맷별 파일을 함께 인코딩한다.
+    hold_static: 고정 구간을 VFR hold 프레임으로 인코딩. 자막을 함께 구울 때는 자막이 바뀌는 프레임을
+                 잃지 않도록 무시한다."""
+    if not segments:
+        raise ValueError("segments가 비어 있어 렌더링할 수 없습니다.")
+
+    counts = frame_counts(segments)
+    total_duration = sum(counts) / FPS
+
+    hold = hold_static and not subtitle_path
+    with tempfile.TemporaryDirectory(prefix="ffmpeg_render_") as tmp_dir:
+        input_args = []
+        chains = []
+        seg_labels = []
+        static_spans = []
+        start_frame = 0
+        for i, (seg, img_path, motion_type, n_frames) in enumerate(zip(segments, image_paths, motions, counts)):
+            cover_w, cover_h = cover_size(img_path, width, height)
+            input_args += ["-i", img_path]
+            chains.append(segment_filter(
+                f"{i}:v", f"s{i}", motion_type, cover_w, cover_h, width, height,
+                seg['end'] - seg['start'], n_frames,
+            ))
+            seg_labels.append(f"[s{i}]")
+            if is_static_segment(motion_type, cover_w, width):
+                static_spans.append((start_frame, n_frames))
+            start_frame += n_frames
+
+        # hold 는 concat 뒤 전체 타임라인에서 (concat 은 세그먼트 길이를 마지막 프레임으로 재므로 앞에서 버리면 안 됨)
+        select = held_select(static_spans) if hold else None
+        chains.append(f"{''.join(seg_labels)}concat=n={len(seg_labels)}:v=1:a=0{',' + select if select else ''}[base]")
+        hold = select is not None
+        next_idx = len(segments)
+
+        overlay_idx = None
+        if title_overlay is not None:
+            input_args += ["-i", _save_overlay(title_overlay, tmp_dir)]
+            overlay_idx = next_idx
+            next_idx += 1
+        scale = None if output_formats else scale_filter(encoder, width, height)
+        chains += finish_video_chains("base", overlay_idx, subtitle_path, scale=scale)
+
+        audio_args, audio_chains, audio_label = audio_inputs_and_filter(audio_path, bgm_path, next_idx, total_duration)
+        input_args += audio_args
+        chains += audio_chains
+
+        out_chains, out_args = output_args("vout", audio_label, save_path, output_formats, width, height,
+                                           total_duration, encoder, video_args=frame_rate_args(hold))
+        command = [
+            ffmpeg_path, "-y", "-hide_banner",
+            *input_args,
+            "-filter_complex", ";".join(chains + out_chains),
+            *out_args,
+        ]
+        subprocess.run(command, check=True)
+    return save_path
+
+
+def _render_chunk(command):
+    result = subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    if result.returncode != 0:
+        err = result.stderr.decode("utf-8", errors="ignore")[-800:]
+        raise RuntimeError(f"세그먼트 청크 인코딩 실패 ({command[-1]}): {err}")
+
+
+def render_segments_parallel(image_paths, segments, motions, audio_path=None, title_overlay=None,
+                             bgm_path=None, save_path="assets/video.mp4", width=720, height=1080,
+                             subtitle_path=None, max_workers=None, encoder=None, output_formats=None,
+                             hold_static=False):
+    """세그먼트마다 독립된 GOP 청크를 병렬로 인코딩한 뒤 concat demuxer(-c copy)로 잇고,
+    오디오는 마지막에 한 번만 먹싱한다. 실제 작업은 ffmpeg 자식 프로세스가 하므로
+    스레드 풀은 프로세스를 띄우고 기다리는 역할만 한다. hold_static 은 render_segments_ffmpeg 와 같다."""
+    if not segments:
+        raise ValueError("segments가 비어 있어 렌더링할 수 없습니다.")
+
+    counts = frame_counts(segments)
+    total_duration = sum(counts) / FPS
+    cpu_count = os.cpu_count() or 1
+    workers = max(1, min(max_workers or cpu_count, len(segments)))
+    threads_per_chunk = max(1, cpu_count // workers)
+    hold = hold_static and not subtitle_path
+
+    os.makedirs(os.path.dirname(save_path) or ".", exist_ok=True)
+    with tempfile.TemporaryDirectory(prefix="ffmpeg_parallel_") as tmp_dir:
+        overlay_path = _save_overlay(title_overlay, tmp_dir) if title_overlay is not None else None
+
+        # 포맷별 (최종 경로, 청크 경로 목록). output_formats가 없으면 save_path 하나
+        targets = output_targets(save_path, output_formats) if output_formats else [(width, height, save_path)]
+        chunk_paths = [[] for _ in targets]
+        commands = []
+        start_frame = 0
+        for i, (seg, img_path, motion_type, n_frames) in enumerate(zip(segments, image_paths, motions, counts)):
+            cover_w, cover_h = cover_size(img_path, width, height)
+            chunk_path = os.path.join(tmp_dir, f"chunk_{i:04d}.mp4")
+            input_args = ["-i", img_path]
+            if overlay_path:
+                input_args += ["-i", overlay_path]
+            chains = [segment_filter(
+                "0:v", "seg", motion_type, cover_w, cover_h, width, height,
+                seg['end'] - seg['start'], n_frames,
+            )]
+            chunk_hold = hold and is_static_segment(motion_type, cover_w, width)
+            select = held_select([(0, n_frames)]) if chunk_hold else None
+            if select:
+                chains.append(f"[seg]{select}[held]")
+            scale = None if output_formats else scale_filter(encoder, width, height)
+            chains += finish_video_chains("held" if select else "seg", 1 if overlay_path else None,
+                                          subtitle_path, start_frame / FPS, scale=scale)
+            chunk_formats = [(w, h) for w, h, _ in targets] if output_formats else None
+            out_chains, out_args = output_args("vout", None, chunk_path, chunk_formats, width, height, None, encoder,
+                                               video_args=["-frames:v", str(n_frames), *frame_rate_args(select is not None)],
+                                               threads=threads_per_chunk)
+            commands.append([
+                ffmpeg_path, "-y", "-hide_banner",
+                *input_args,
+                "-filter_complex", ";".join(chains + out_chains),
+                *out_args,
+            ])
+            for k, (w, h, _) in enumerate(targets):
+                chunk_paths[k].append(chunk_path if k == 0 else format_output_path(chunk_path, (w, h)))
+            start_frame += n_frames
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+            # 예외가 있으면 여기서 그대로 올라옴
+            list(executor.map(_render_chunk, commands))
+
+        # 오디오 믹스는 첫 포맷에서 한 번만 wav로 만들고 나머지 포맷은 그대로 먹싱
+        mixed_path = None
+        if len(targets) > 1:
+            mixed_path = mix_audio_track(audio_path, bgm_path, total_duration,
+                                         os.path.join(tmp_dir, "mixed.wav"))
+        for k, (_, _, out_path) in enumerate(targets):
+            list_path = os.path.join(tmp_dir, f"chunks_{k}.txt")
+            with open(list_path, "w", encoding="utf-8") as f:
+                for p, n_frames in zip(chunk_paths[k], counts):
+                    # 청크 길이를 명시 (VFR hold 청크는 컨테이너 길이에 마지막 프레임 길이가 빠짐)
+                    f.write(f"file '{p}'\nduration {n_frames / FPS:.6f}\n")
+
+            if mixed_path:
+                audio_args, audio_chains, audio_map = ["-i", mixed_path], [], "1:a"
+            else:
+                audio_args, audio_chains, audio_label = audio_inputs_and_filter(audio_path, bgm_path, 1, total_duration)
+                audio_map = f"[{audio_label}]"
+            os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+            command = [
+                ffmpeg_path, "-y", "-hide_banner",
+                "-f", "concat", "-safe", "0", "-i", list_path,
+                *audio_args,
+                *(["-filter_complex", ";".join(audio_chains)] if audio_chains else []),
+                "-map", "0:v", "-map", audio_map,
+                "-t", f"{total_duration:.3f}",
+                "-c:v", "copy", "-c:a", "aac",
+                out_path,
+            ]
+            subprocess.run(command, check=True)
+    return save_path
+
+
+class OverlayBlender:
+    """RGBA 오버레이(타이틀 레이어)를 프레임 버퍼 상단에 알파 합성. 정수 연산 + 미리 할당한 버퍼만 사용."""
+
+    def __init__(self, overlay):
+        h = overlay.shape[0]
+        alpha = overlay[..., 3:4].astype(np.uint16)
+        self.rows = h
+        self.inv_alpha = 255 - alpha
+        self.premultiplied = overlay[..., :3].astype(np.uint16) * alpha + 127  # +127: 반올림
+        self.scratch = np.empty(overlay.shape[:2] + (3,), dtype=np.uint16)
+
+    def blend(self, frame):
+        region = frame[:self.rows]
+        np.multiply(region, self.inv_alpha, out=self.scratch)
+        self.scratch += self.premultiplied
+        self.scratch //= 255
+        np.copyto(region, self.scratch, casting="unsafe")
+
+
+def render_segments_pipe(image_paths, segments, motions, audio_path=None, title_overlay=None,
+                         bgm_path=None, save_path="assets/video.mp4", width=720, height=1080,
+                         subtitle_path=None, encoder=None, output_formats=None, hold_static=False):
+    """프레임을 NumPy로 직접 합성해 ffmpeg 프로세스 하나의 stdin(rawvideo rgb24)으로 흘려보내는 렌더러.
+    프레임 버퍼는 하나를 계속 재사용하고, 크롭이 직전 프레임과 같으면 합성 없이 같은 버퍼를 다시 쓴다.
+    hold_static: 고정 세그먼트의 중복 프레임을 인코더 앞에서 버리고 VFR hold 로 인코딩 (자막과 함께면 무시)"""
+    if not segments:
+        raise ValueError("segments가 비어 있어 렌더링할 수 없습니다.")
+
+    counts = frame_counts(segments)
+    total_duration = sum(counts) / FPS
+    blender = OverlayBlender(title_overlay) if title_overlay is not None else None
+    frame_buf = np.empty((height, width, 3), dtype=np.uint8)
+    # 모션 소스는 미리 만들어 두고(버퍼는 이미지 캐시 공유) 고정 구간을 select 필터에 반영
+    sources = [
+        MotionSource(img_path, seg['end'] - seg['start'], width, height, motion_type, FPS, n_frames)
+        for seg, img_path, motion_type, n_frames in zip(segments, image_paths, motions, counts)
+    ]
+    hold = hold_static and not subtitle_path
+    select = None
+    if hold:
+        starts = np.cumsum([0] + counts[:-1])
+        select = held_select([(int(start), n) for start, n, src in zip(starts, counts, sources) if src.is_static])
+
+    audio_args, audio_chains, audio_label = audio_inputs_and_filter(audio_path, bgm_path, 1, total_duration)
+    scale = None if output_formats else scale_filter(encoder, width, height)
+    video_label = "0:v"
+    chains = []
+    if select:
+        chains.append(f"[0:v]{select}[held]")
+        video_label = "held"
+    chains += finish_video_chains(video_label, None, subtitle_path, scale=scale)
+    out_chains, out_args = output_args("vout", audio_label, save_path, output_formats, width, height,
+                                       total_duration, encoder, video_args=["-fps_mode", "vfr"] if select else ())
+    command = [
+        ffmpeg_path, "-y", "-hide_banner", "-loglevel", "error",
+        "-f", "rawvideo", "-pix_fmt", "rgb24", "-s", f"{width}x{height}", "-r", str(FPS), "-i", "-",
+        *audio_args,
+        "-filter_complex", ";".join(chains + audio_chains + out_chains),
+        *out_args,
+    ]
+
+    proc = subprocess.Popen(command, stdin=subprocess.PIPE)
+    try:
+        for source, n_frames in zip(sources, counts):
+            for i in range(n_frames):
+                if i == 0 or not source.is_repeat(i):
+                    np.copyto(frame_buf, source.frame(i))
+                    if blender is not None:
+                        blender.blend(frame_buf)
+                proc.stdin.write(memoryview(frame_buf))
+        proc.stdin.close()
+    except BrokenPipeError:
+        pass  # ffmpeg가 먼저 죽은 경우: 아래 returncode 로 보고
+    finally:
+        if proc.stdin and not proc.stdin.closed:
+            try:
+                proc.stdin.close()
+            except BrokenPipeError:
+                pass
+        returncode = proc.wait()
+    if returncode != 0:
+        raise subprocess.CalledProcessError(returncode, command)
+    return save_path
+
+
+def render_still_image(frame, duration, audio_path=None, bgm_path=None, save_path="assets/dark_text_video.mp4",
+                       encoder=None, output_formats=None, hold_static=False):
+    """정지 화면(RGB numpy 배열) 한 장 + 오디오/BGM -> mp4. 프레임 합성 없이 이미지 루프만 인코딩.
+    output_formats가 있으면 포맷별 파일을 같은 프로세스에서 함께 인코딩한다.
+    hold_static: 24fps 복제 대신 HOLD_REFRESH_FRAMES 간격 프레임만 VFR로 인코딩"""
+    with tempfile.TemporaryDirectory(prefix="ffmpeg_still_") as tmp_dir:
+        still_path = os.path.join(tmp_dir, "still.png")
+        Image.fromarray(frame).save(still_path)
+
+        audio_args, audio_chains, audio_label = audio_inputs_and_filter(audio_path, bgm_path, 1, duration)
+        height, width = frame.shape[:2]
+        scale = None if output_formats else scale_filter(encoder, width, height)
+        select = held_select([(0, max(1, round(duration * FPS)))]) if hold_static else None
+        filters = [f for f in (select, scale, "format=yuv420p") if f]
+        chains = [f"[0:v]{','.join(filters)}[vout]"] + audio_chains
+        video_args = ["-tune", "stillimage", *(["-fps_mode", "vfr"] if select else [])]
+        out_chains, out_args = output_args("vout", audio_label, save_path, output_formats, width, height,
+                                           duration, encoder, video_args=video_args)
+
+        command = [
+            ffmpeg_path, "-y", "-hide_banner",
+            "-loop", "1", "-framerate", str(FPS), "-i", still_path,
+            *audio_args,
+            "-filter_complex", ";".join(chains + out_chains),
+            *out_args,
+        ]
+        subprocess.run(command, check=True)
+    return save_path
@@ -4,9 +4,16 @@ import re
 # generate_timed_segments.py
 import os
 import re
-from elevenlabs_tts import generate_tts
+import time
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from elevenlabs_tts import generate_tts, generate_tts_with_timestamps, stream_tts_to_file, TTSRateLimitError, TTS_STREAM_CHUNK
+from tts_cache import cached_tts, cached_tts_stream, cached_tts_with_timestamps, cache_stats
+from mp3_frames import concat_mp3, mp3_duration, Mp3FrameParser
 from pydub import AudioSegment
 from moviepy import AudioFileClip
+from moviepy.video.io.ffmpeg_reader import ffmpeg_parse_infos
 import kss
 
 SUBTITLE_TEMPLATES = {
@@ -177,40 +184,265 @@ def split_script_to_lines(script_text: str):
 
     return lines
 
-def generate_tts_per_line(script_lines, provider, template, polly_voice_key="korean_female1"):
-    audio_paths = []
+# 라인별 TTS 동시 요청 상한 (프로바이더별, 프로세스 전체에서 공유)
+# ElevenLabs는 요금제별 동시 요청 한도가 낮아 3, Polly는 초당 요청 한도가 넉넉해서 8
+TTS_MAX_CONCURRENCY = {"elevenlabs": 3, "polly": 8}
+TTS_MAX_RETRIES = 5        # 429/스로틀링 재시도 횟수
+TTS_BACKOFF_BASE = 1.0     # 지수 백오프 기준(초): 1, 2, 4, ... 에 full jitter
+TTS_BACKOFF_MAX = 20.0
+
+_tts_slots = {}
+_tts_slots_lock = threading.Lock()
+
+def _provider_slots(provider):
+    # 같은 프로바이더를 쓰는 호출끼리 (max_workers와 상관없이) 프로바이더 상한 하나를 함께 나눠 씀
+    with _tts_slots_lock:
+        if provider not in _tts_slots:
+            _tts_slots[provider] = threading.BoundedSemaphore(TTS_MAX_CONCURRENCY.get(provider, 3))
+        return _tts_slots[provider]
+
+def _worker_limit(provider, max_workers):
+    # 호출별 워커 수: max_workers로 줄일 수는 있지만 프로바이더 상한을 넘지는 않음
+    cap = TTS_MAX_CONCURRENCY.get(provider, 3)
+    return max(1, min(max_workers or cap, cap))
+
+def _with_backoff(request):
+    # 요청 한도 초과면 서버가 준 Retry-After(없으면 지수 백오프 + jitter)만큼 쉬었다가 재시도
+    for attempt in range(TTS_MAX_RETRIES + 1):
+        try:
+            return request()
+        except TTSRateLimitError as e:
+            if attempt == TTS_MAX_RETRIES:
+                raise
+            delay = e.retry_after or random.uniform(0, min(TTS_BACKOFF_MAX, TTS_BACKOFF_BASE * 2 ** attempt))
+            print(f"⏳ TTS 요청 한도 초과 → {delay:.1f}초 후 재시도 ({attempt + 1}/{TTS_MAX_RETRIES})")
+            time.sleep(delay)
+
+def _synthesize_line(line, line_audio_path, provider, template, slots, cache=True):
+    # cache: True면 tts_cache(같은 문장/보이스/설정이면 이전 mp3 재사용)를 거쳐 요청
+    synthesize = cached_tts if cache else generate_tts
+
+    def request():
+        with slots:
+            if provider == "polly":
+                return synthesize(text=line, save_path=line_audio_path, provider="polly",
+                                  polly_voice_name_key=template)
+            return synthesize(text=line, save_path=line_audio_path, provider="elevenlabs",
+                              template_name=template)
+
+    return _with_backoff(request)
+
+def generate_tts_per_line(script_lines, provider, template, polly_voice_key="korean_female1", max_workers=None,
+                          cache=True):
+    # 라인별 TTS를 프로바이더 동시 요청 상한 안에서 병렬로 생성. 결과는 항상 스크립트 순서
+    # (실패한 라인은 이전처럼 건너뜀). max_workers: 동시 요청 수 (기본/상한: TTS_MAX_CONCURRENCY)
+    # cache: True면 tts_cache 히트 라인은 네트워크 요청 없이 복사
     temp_audio_dir = "temp_line_audios"
     os.makedirs(temp_audio_dir, exist_ok=True)
 
-    print(f"디버그: 총 {len(script_lines)}개의 스크립트 라인에 대해 TTS 생성 시도.")
+    limit = _worker_limit(provider, max_workers)
+    slots = _provider_slots(provider)
+    print(f"디버그: 총 {len(script_lines)}개의 스크립트 라인에 대해 TTS 생성 시도 (동시 {limit}개).")
+    stats_before = cache_stats()
 
-    for i, line in enumerate(script_lines):
+    def synthesize(i):
+        line = script_lines[i]
         line_audio_path = os.path.join(temp_audio_dir, f"line_{i}.mp3")
         try:
-            if provider == "polly":
-                generate_tts(
-                    text=line,
-                    save_path=line_audio_path,
-                    provider="polly",
-                    polly_voice_name_key=template
-                )
-            else: 
-                generate_tts(
-                    text=line,
-                    save_path=line_audio_path,
-                    provider="elevenlabs",
-                    template_name=template
-                )
-            audio_paths.append(line_audio_path)
+            _synthesize_line(line, line_audio_path, provider, template, slots, cache)
             print(f"디버그: 라인 {i+1} ('{line[:30]}...') TTS 생성 성공. 파일: {line_audio_path}")
+            return line_audio_path
         except Exception as e:
             print(f"오류: 라인 {i+1} ('{line[:30]}...') TTS 생성 실패: {e}")
-            continue
-            
+            return None
+
+    if not script_lines:
+        results = []
+    else:
+        with ThreadPoolExecutor(max_workers=min(limit, len(script_lines))) as executor:
+            # map은 제출 순서대로 결과를 돌려주므로 병합/타이밍 순서가 유지됨
+            results = list(executor.map(synthesize, range(len(script_lines))))
+    audio_paths = [p for p in results if p]
+    if cache:
+        stats = cache_stats()
+        print(f"🎙️ TTS 캐시: 히트 {stats['hits'] - stats_before['hits']} / 미스 {stats['misses'] - stats_before['misses']}")
+
     print(f"디버그: 최종 생성된 오디오 파일 경로 수: {len(audio_paths)}")
     return audio_paths
 
+def _stream_line(line, line_audio_path, provider, template, slots, cache, on_progress):
+    # _synthesize_line의 스트리밍 버전: 받는 청크마다 line_audio_path에 쓰고 on_progress(누적 바이트)
+    synthesize = cached_tts_stream if cache else stream_tts_to_file
+    voice = {"polly_voice_name_key": template} if provider == "polly" else {"template_name": template}
+
+    def request():
+        with slots:
+            return synthesize(line, line_audio_path, provider, on_progress=on_progress, **voice)
+
+    return _with_backoff(request)
+
+def generate_tts_streamed(script_lines, output_path, provider, template, max_workers=None, cache=True):
+    # 라인별 스트리밍 TTS + 조립 파이프라인.
+    # 워커들은 generate_tts_per_line처럼 동시에 합성하되 응답을 청크 단위로 라인 파일에 쓰고,
+    # 호출 스레드는 스크립트 순서상 지금 차례인 라인 파일을 따라 읽으면서 완성된 mp3 프레임을 output_path에
+    # 바로 이어 붙이고 길이를 센다 (다운로드와 병합/타이밍 계산이 겹침, 메모리는 청크 단위).
+    # 반환: merge_audio_files와 같은 segments (실패한 라인은 건너뜀, 전부 실패면 []).
+    # 프레임 단위로 이을 수 없는 응답(갭리스 헤더/형식 불일치)이면 다 받은 뒤 merge_audio_files로 폴백.
+    temp_audio_dir = "temp_line_audios"
+    os.makedirs(temp_audio_dir, exist_ok=True)
+    n = len(script_lines)
+    if not n:
+        return []
+
+    limit = _worker_limit(provider, max_workers)
+    slots = _provider_slots(provider)
+    print(f"디버그: 총 {n}개의 스크립트 라인에 대해 스트리밍 TTS 생성 시도 (동시 {limit}개).")
+    stats_before = cache_stats()
+
+    paths = [os.path.join(temp_audio_dir, f"line_{i}.mp3") for i in range(n)]
+    received = [0] * n   # 라인별로 파일에 쓰인 바이트 수
+    done = [None] * n    # True: 성공, False: 실패, None: 진행 중
+    changed = threading.Condition()
+
+    def synthesize(i):
+        def on_progress(size):
+            with changed:
+                received[i] = size
+                changed.notify_all()
+
+        ok = False
+        try:
+            _stream_line(script_lines[i], paths[i], provider, template, slots, cache, on_progress)
+            ok = True
+        except Exception as e:
+            print(f"오류: 라인 {i+1} ('{script_lines[i][:30]}...') 스트리밍 TTS 실패: {e}")
+        with changed:
+            done[i] = ok
+            changed.notify_all()
+
+    def follow(i):
+        # 라인 i 파일을 워커가 쓰는 대로 따라 읽기 (끝나면 성공 여부 반환)
+        read, f = 0, None
+        try:
+            while True:
+                with changed:
+                    changed.wait_for(lambda: received[i] > read or done[i] is not None)
+                    available, finished = received[i], done[i]
+                if available > read:
+                    f = f or open(paths[i], "rb")
+                    f.seek(read)
+                    chunk = f.read(min(available - read, TTS_STREAM_CHUNK))  # 이미 다 받은 라인도 청크 단위로
+                    read += len(chunk)
+                    yield chunk
+                elif finished is not None:
+                    return
+        finally:
+            if f:
+                f.close()
+
+    out_dir = os.path.dirname(output_path) or "."
+    os.makedirs(out_dir, exist_ok=True)
+    tmp_path = f"{output_path}.{os.getpid()}.part"
+    durations, fmt, fallback = [], None, None
+    t0 = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=min(limit, n)) as executor:
+            for i in range(n):
+                executor.submit(synthesize, i)
+            with open(tmp_path, "wb") as out:
+                for i in range(n):
+                    parser = Mp3FrameParser()
+                    line_start = out.tell()
+                    for chunk in follow(i):
+                        if fallback is None:
+                            out.write(parser.feed(chunk))
+                    if done[i] and fallback is None:
+                        if not parser.finish():
+                            fallback = f"라인 {i+1}: {parser.error}"
+                        elif fmt is not None and parser.format != fmt:
+                            fallback = f"라인 {i+1}: 형식이 다름 {parser.format} != {fmt}"
+                        else:
+                            fmt = parser.format
+                            durations.append(parser.duration)
+                    elif not done[i]:
+                        out.seek(line_start)  # 실패한 라인이 남긴 프레임 되돌리기
+                        out.truncate()
+                    if done[i] and fallback is None:
+                        print(f"디버그: 라인 {i+1} 조립 완료 ({durations[-1]:.2f}초, 경과 {time.perf_counter() - t0:.2f}초)")
+
+        if cache:
+            stats = cache_stats()
+            print(f"🎙️ TTS 캐시: 히트 {stats['hits'] - stats_before['hits']} / 미스 {stats['misses'] - stats_before['misses']}")
+        audio_paths = [p for p, ok in zip(paths, done) if ok]
+        if not audio_paths:
+            return []
+        if fallback is not None:
+            print(f"경고: 스트리밍 조립 불가 → 파일 병합으로 진행: {fallback}")
+            return merge_audio_files(audio_paths, output_path)
+        os.replace(tmp_path, output_path)
+    finally:
+        # 예외로 빠져나가도(Ctrl+C 포함) 조립 중이던 임시 파일을 남기지 않음. 성공했으면 이미 output_path로 옮겨져 없음
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+    segments = []
+    current_time = 0
+    for duration in durations:
+        segments.append({
+            "start": current_time,
+            "end": current_time + duration
+        })
+        current_time += duration
+    return segments
+
+def generate_tts_batch(script_lines, output_path, provider, template, cache=True):
+    # 스크립트 전체를 한 요청으로 합성해 output_path에 저장하고, 프로바이더 정렬 정보(ElevenLabs 글자 타임스탬프 /
+    # Polly SSML speech marks)로 라인 경계를 잡아 merge_audio_files와 같은 형태의 segments를 만든다.
+    # 스크립트가 한도를 넘거나 정렬 정보를 라인에 맞추지 못하면 None (호출 측에서 라인별 TTS로 폴백)
+    synthesize = cached_tts_with_timestamps if cache else generate_tts_with_timestamps
+    voice = {"polly_voice_name_key": template} if provider == "polly" else {"template_name": template}
+    try:
+        line_starts = _with_backoff(lambda: synthesize(script_lines, output_path, provider, **voice))
+        total_duration = mp3_duration(output_path) or ffmpeg_parse_infos(output_path)["duration"]
+    except Exception as e:
+        print(f"경고: 전체 스크립트 TTS 실패 → 라인별 TTS로 진행: {e}")
+        return None
+    return segments_from_line_starts(line_starts, total_duration)
+
+def segments_from_line_starts(line_starts, total_duration):
+    # 라인 i 구간 = [라인 i 시작, 라인 i+1 시작), 첫 구간은 0초부터, 마지막 구간은 음성 끝까지
+    # (merge_audio_files처럼 빈틈 없이 이어지는 구간)
+    segments = []
+    for i, start in enumerate(line_starts):
+        start = 0.0 if i == 0 else start
+        end = line_starts[i + 1] if i + 1 < len(line_starts) else total_duration
+        segments.append({"start": start, "end": max(start, end)})
+    return segments
+
+def audio_duration(path):
+    # mp3는 프레임 헤더에서 디코딩 없이 (pydub 디코딩 결과와 같은 값), 그 밖의 형식만 디코딩해서 측정
+    duration = mp3_duration(path)
+    return duration if duration is not None else AudioSegment.from_file(path).duration_seconds
+
 def merge_audio_files(audio_paths, output_path):
+    # 모두 같은 형식의 mp3(갭리스 헤더 없음)면 디코딩/재인코딩 없이 프레임 바이트를 그대로 이어 붙이고
+    # 길이는 프레임 헤더에서 구한다. 구간 값은 디코딩 경로와 같다.
+    durations = concat_mp3(audio_paths, output_path) if output_path.lower().endswith(".mp3") else None
+    if durations is None:
+        return _merge_audio_files_decoded(audio_paths, output_path)
+
+    segments = []
+    current_time = 0
+    for duration in durations:
+        segments.append({
+            "start": current_time,
+            "end": current_time + duration
+        })
+        current_time += duration
+    return segments
+
+def _merge_audio_files_decoded(audio_paths, output_path):
+    # 형식이 섞였거나 갭리스 헤더가 있는 mp3: pydub 디코딩 -> 이어 붙이기 -> 재인코딩
     merged = AudioSegment.empty()
     segments = []
     current_time = 0
@@ -235,8 +467,7 @@ def get_segments_from_audio(audio_paths, script_lines):
     current_time = 0
     for i, audio_path in enumerate(audio_paths):
         try:
-            audio = AudioSegment.from_file(audio_path)
-            duration = audio.duration_seconds
+            duration = audio_duration(audio_path)
             line = script_lines[i]
             segments.append({
                 "start": current_time,
@@ -295,8 +526,12 @@ def generate_subtitle_from_script(
     polly_voice_key: str = "korean_female",
     # ▼ 새로 추가: 자막 언어 컨트롤
     subtitle_lang: str = "ko",             # "auto" | "ko" | "en"
-    translate_only_if_english: bool = False   # True면 "원문이 영어일 때만 ko로 번역"
+    translate_only_if_english: bool = False,   # True면 "원문이 영어일 때만 ko로 번역"
     # 현재는 한국어자막만 사용할 것이기 때문에 False
+    tts_concurrency: int = None,            # 라인별 TTS 동시 요청 수 (None: 프로바이더 기본값, 상한을 넘지 않음)
+    tts_cache: bool = True,                 # 같은 문장/보이스/설정이면 이전 음성 재사용 (assets/cache/tts)
+    tts_mode: str = "per_line"              # "per_line" | "batch" (전체 스크립트 1회 요청 + 프로바이더 타임스탬프)
+                                            # | "stream" (라인별 스트리밍 응답을 받는 대로 병합)
 ):
     print(f"디버그: 자막 생성을 위한 스크립트 라인 분리 중...")
     script_lines = split_script_to_lines(script_text)
@@ -326,14 +561,28 @@ def generate_subtitle_from_script(
         if target is not None else script_lines
     )
 
-    # 3) 라인별 TTS (원문 기준)
-    audio_paths = generate_tts_per_line(tts_lines, provider=provider, template=template)
-    if not audio_paths:
-        print("오류: 라인별 오디오 파일이 생성되지 않았습니다. 빈 segments 반환.")
-        return [], None, ass_path
-
-    # 4) 병합 및 타이밍
-    segments_raw = merge_audio_files(audio_paths, full_audio_file_path)
+    # 3) TTS (원문 기준)
+    segments_raw = None
+    if tts_mode == "batch":
+        # 전체 스크립트 1회 요청: 라인 경계는 프로바이더 타임스탬프에서 (디코딩/병합 없음)
+        segments_raw = generate_tts_batch(tts_lines, full_audio_file_path, provider, template, cache=tts_cache)
+    elif tts_mode == "stream":
+        # 라인별 스트리밍: 받는 청크를 바로 전체 오디오에 이어 붙이고 길이도 그때 계산
+        segments_raw = generate_tts_streamed(tts_lines, full_audio_file_path, provider, template,
+                                             max_workers=tts_concurrency, cache=tts_cache)
+        if not segments_raw:
+            print("오류: 스트리밍 TTS로 생성된 라인이 없습니다. 빈 segments 반환.")
+            return [], None, ass_path
+    if segments_raw is None:
+        # 라인별 TTS (동시 요청 + 스크립트 순서 유지)
+        audio_paths = generate_tts_per_line(tts_lines, provider=provider, template=template,
+                                            max_workers=tts_concurrency, cache=tts_cache)
+        if not audio_paths:
+            print("오류: 라인별 오디오 파일이 생성되지 않았습니다. 빈 segments 반환.")
+            return [], None, ass_path
+
+        # 4) 병합 및 타이밍
+        segments_raw = merge_audio_files(audio_paths, full_audio_file_path)
     segments = []
     for i, s in enumerate(segments_raw):
         # 자막 문장은 번역된 문장(또는 원문) 사용
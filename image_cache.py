@@ -0,0 +1,79 @@
+import threading
+from collections import OrderedDict
+import numpy as np
+from PIL import Image
+from disk_cache import DiskCache, file_digest
+
+# 모션 클립용 이미지 준비 캐시
+# Pexels 원본(수 MP)을 매번 풀 해상도로 디코딩하고 커버 리사이즈하던 것을
+#   1) JPEG draft / reduce 로 목표 크기 바로 위까지만 디코딩
+#   2) (파일 해시, 목표 크기) 키로 메모리 LRU + 디스크(.npy) 캐시
+# 로 바꿔서, 패딩으로 반복되는 이미지나 재실행 시 같은 이미지는 디코딩/리사이즈를 건너뛴다.
+
+MEMORY_MAX_BYTES = 512 * 1024 * 1024
+DISK_MAX_BYTES = 2 * 1024 * 1024 * 1024
+
+_memory = OrderedDict()
+_memory_bytes = 0
+_lock = threading.Lock()
+_disk = DiskCache("images", DISK_MAX_BYTES)
+
+
+def _decode_near(img_path, size):
+    """size(w, h) 이상이 되는 가장 작은 배율로 디코딩한 RGB 이미지"""
+    with Image.open(img_path) as im:
+        if im.format == "JPEG":
+            # DCT 스케일링(1/2, 1/4, 1/8)으로 요청 크기 이상 중 가장 작게 디코딩
+            im.draft("RGB", size)
+            return im.convert("RGB")
+        factor = int(min(im.width / size[0], im.height / size[1]))
+        if factor >= 2:
+            return im.reduce(factor).convert("RGB")
+        return im.convert("RGB")
+
+
+def _remember(key, arr):
+    global _memory_bytes
+    with _lock:
+        if key in _memory:
+            _memory.move_to_end(key)
+            return
+        _memory[key] = arr
+        _memory_bytes += arr.nbytes
+        while _memory_bytes > MEMORY_MAX_BYTES and len(_memory) > 1:
+            _, old = _memory.popitem(last=False)
+            _memory_bytes -= old.nbytes
+
+
+def prepare_image(img_path, size):
+    """img_path를 size(w, h)로 리사이즈한 읽기 전용 RGB uint8 배열 (캐시됨)"""
+    size = (int(size[0]), int(size[1]))
+    key = f"{file_digest(img_path)}_{size[0]}x{size[1]}"
+
+    with _lock:
+        arr = _memory.get(key)
+        if arr is not None:
+            _memory.move_to_end(key)
+            return arr
+
+    cached = _disk.get(key, ".npy")
+    arr = None
+    if cached:
+        try:
+            arr = np.load(cached)
+        except (OSError, ValueError):
+            arr = None  # 깨진 캐시 파일이면 다시 만든다
+    if arr is None or arr.shape[:2] != (size[1], size[0]):
+        with _decode_near(img_path, size) as im:
+            arr = np.asarray(im.resize(size, Image.Resampling.LANCZOS))
+        _disk.put(key, ".npy", lambda tmp: np.save(tmp, arr))
+
+    arr.flags.writeable = False  # 캐시 공유 배열이므로 읽기 전용
+    _remember(key, arr)
+    return arr
+
+
+def image_size(img_path):
+    """디코딩 없이 헤더만 읽은 원본 (w, h)"""
+    with Image.open(img_path) as im:
+        return im.size
@@ -0,0 +1,144 @@
+import numpy as np
+from PIL import Image
+from moviepy import VideoClip
+from image_cache import prepare_image, image_size
+from disk_cache import key_digest
+
+# 크롭 기반 Ken Burns 모션 엔진
+# 기존 create_motion_clip은 줌 구간에서 매 프레임 원본 전체를 resized(zoom_factor)로 다시 리샘플하고,
+# 패닝은 화면보다 큰 클립을 합성기 안에서 움직였다.
+# 여기서는 이미지를 한 번만 (커버 크기 x 최대 줌 배율) 버퍼로 리샘플해 두고,
+# 프레임마다 크롭 박스만 NumPy로 계산해서
+#   - 패닝/고정: 정수 크롭(배열 슬라이스, 리샘플 없음)
+#   - 줌: 서브픽셀 크롭 + 고정 크기(width x height) 리사이즈 한 번
+# 으로 프레임을 만든다.
+
+MOTION_TYPES = ["zoom_in_out", "left_to_right", "right_to_left", "static"]
+
+# create_motion_clip / ffmpeg 렌더러와 공유하는 모션 파라미터
+ZOOM_START_SCALE = 1.0
+ZOOM_END_SCALE = 1.05
+PAN_START_RATIO = 0.3
+PAN_END_RATIO = 0.6
+PAN_MIN_MOVE = 30  # 이보다 여유 폭이 작으면 고정(중앙)
+
+MAX_BUFFER_SCALE = 2.0  # 줌 버퍼 상한 (커버 크기 대비)
+
+
+def motion_for_segment(seed, index):
+    """(잡 시드, 세그먼트 번호)만으로 정해지는 모션 타입.
+    전역 random 상태나 다른 세그먼트와 무관하므로 병렬 워커/캐시/벤치마크에서 항상 같은 결과가 나온다."""
+    return MOTION_TYPES[int(key_digest("motion", seed, index)[:8], 16) % len(MOTION_TYPES)]
+
+
+def plan_motions(seed, count):
+    """세그먼트 count개의 모션 계획을 미리 계산"""
+    return [motion_for_segment(seed, i) for i in range(count)]
+
+
+def cover_dims(src_w, src_h, width, height):
+    """이미지가 화면을 가득 덮는 '커버' 리사이즈 크기 (create_motion_clip과 동일한 반올림)"""
+    scale = max(width / src_w, height / src_h)
+    return max(1, round(src_w * scale)), max(1, round(src_h * scale))
+
+
+def ease_in_out(progress):
+    # 3p^2 - 2p^3 (스칼라/배열 모두 지원)
+    return 3 * progress ** 2 - 2 * progress ** 3
+
+
+def motion_boxes(motion_type, t, duration, cover_w, cover_h, width, height):
+    """시각 t(스칼라 또는 배열)마다 커버 이미지 좌표계의 크롭 박스 (x0, y0, x1, y1) 배열.
+    moviepy 경로의 위치 계산(round 포함)을 그대로 크롭 좌표로 옮긴 것."""
+    t = np.atleast_1d(np.asarray(t, dtype=np.float64))
+    progress = np.clip(t / duration, 0.0, 1.0) if duration > 0 else np.zeros_like(t)
+    center_x = round((width - cover_w) / 2)
+    center_y = round((height - cover_h) / 2)
+    max_move = cover_w - width
+
+    if motion_type == "zoom_in_out":
+        # 가로 중앙 / 상단 고정으로 1.0 -> 1.05 확대 (y가 음수면 0으로 보정하던 것과 같음)
+        scale = ZOOM_START_SCALE + (ZOOM_END_SCALE - ZOOM_START_SCALE) * progress
+        x = np.round((width - cover_w * scale) / 2)
+        x0 = -x / scale
+        y0 = np.zeros_like(scale)
+        return np.stack([x0, y0, x0 + width / scale, y0 + height / scale], axis=-1)
+
+    if motion_type in ("left_to_right", "right_to_left") and max_move >= PAN_MIN_MOVE:
+        move_distance = max_move * (PAN_END_RATIO - PAN_START_RATIO)
+        eased = ease_in_out(progress)
+        if motion_type == "left_to_right":
+            x = np.round(-max_move * PAN_START_RATIO + move_distance * eased)
+        else:
+            x = np.round(-max_move * PAN_END_RATIO - move_distance * eased)
+        x0 = -x
+    else:
+        # static (또는 이동 폭이 작아 고정되는 패닝): 중앙 고정
+        x0 = np.full_like(t, -center_x)
+    y0 = np.full_like(t, -center_y)
+    return np.stack([x0, y0, x0 + width, y0 + height], axis=-1)
+
+
+def load_motion_buffer(img_path, width, height, motion_type):
+    """모션 한 번에 필요한 리샘플 버퍼. (RGB uint8 배열, 커버 크기, 버퍼/커버 배율)
+    줌은 끝 배율까지 확대해도 업샘플이 생기지 않게 최대 줌 배율만큼 크게 만든다."""
+    cover_w, cover_h = cover_dims(*image_size(img_path), width, height)
+    buffer_scale = min(ZOOM_END_SCALE, MAX_BUFFER_SCALE) if motion_type == "zoom_in_out" else 1.0
+    buf_size = (max(1, round(cover_w * buffer_scale)), max(1, round(cover_h * buffer_scale)))
+    # 디코딩/리사이즈 결과는 image_cache가 (파일 해시, 크기) 기준으로 캐시
+    buf = prepare_image(img_path, buf_size)
+    return buf, (cover_w, cover_h), buf_size[0] / cover_w
+
+
+class MotionSource:
+    """프레임 번호 -> width x height 모션 프레임. make_motion_clip 과 파이프 렌더러가 공유한다.
+    패닝/고정 프레임은 버퍼 슬라이스(복사 없음), 줌 프레임은 마지막 결과를 재사용."""
+
+    def __init__(self, img_path, duration, width, height, motion_type, fps=24, n_frames=None):
+        self.width, self.height = width, height
+        self.motion_type = motion_type
+        self.buf, (cover_w, cover_h), buffer_scale = load_motion_buffer(img_path, width, height, motion_type)
+
+        # 프레임 시각별 크롭 박스를 한 번에 계산 (버퍼 좌표계)
+        self.n_frames = n_frames or max(1, int(np.ceil(duration * fps)))
+        self.boxes = motion_boxes(motion_type, np.arange(self.n_frames) / fps, duration,
+                                  cover_w, cover_h, width, height) * buffer_scale
+        if motion_type == "zoom_in_out":
+            self.pil_buf = Image.fromarray(self.buf)
+        else:
+            # 정수 크롭만 필요
+            self.offsets = self.boxes[:, :2].astype(np.int64)
+        self._last_index = None
+        self._last_frame = None
+
+    @property
+    def is_static(self):
+        """구간 전체가 한 크롭(고정 또는 이동 폭이 작아 고정되는 패닝)이면 True"""
+        return bool(np.all(self.boxes == self.boxes[0]))
+
+    def is_repeat(self, i):
+        """i번째 프레임이 직전 프레임과 같은 크롭인지 (고정 구간이면 합성을 건너뛸 수 있음)"""
+        i = min(i, self.n_frames - 1)
+        return i > 0 and bool(np.array_equal(self.boxes[i], self.boxes[i - 1]))
+
+    def frame(self, i):
+        i = min(i, self.n_frames - 1)
+        if self.motion_type != "zoom_in_out":
+            x0, y0 = self.offsets[i]
+            return self.buf[y0:y0 + self.height, x0:x0 + self.width]
+        if self._last_index != i:
+            # 서브픽셀 크롭 + 고정 크기 리사이즈를 한 번의 C 호출로 처리
+            self._last_frame = np.asarray(self.pil_buf.resize(
+                (self.width, self.height), Image.Resampling.BILINEAR, box=tuple(self.boxes[i])))
+            self._last_index = i
+        return self._last_frame
+
+
+def make_motion_clip(img_path, duration, width, height, motion_type, fps=24):
+    """width x height 로 바로 합성 가능한 모션 VideoClip (위치 지정 없이 (0, 0)에 놓으면 됨)"""
+    source = MotionSource(img_path, duration, width, height, motion_type, fps)
+
+    def frame_function(t):
+        return source.frame(int(t * fps + 1e-6))
+
+    return VideoClip(frame_function, duration=duration)
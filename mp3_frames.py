@@ -0,0 +1,208 @@
+import os
+import tempfile
+
+# MP3 프레임 헤더 기반 길이 측정 / 이어 붙이기 (디코딩 없음)
+# 라인별 TTS mp3를 pydub으로 디코딩 -> PCM 이어 붙이기 -> mp3 재인코딩하던 것을
+# 프레임 헤더만 읽어서 길이(프레임 수 x 프레임당 샘플 수 / 샘플레이트)를 구하고 프레임 바이트를 그대로 잇는다.
+# Xing/Info 헤더(갭리스 정보)가 있는 파일은 ffmpeg(pydub)가 디코딩할 때 그 프레임을 건너뛰고 LAME 태그의
+# 인코더 지연/패딩을 잘라내므로 길이도 같은 규칙으로 계산한다. 다만 이런 파일은 바이트를 그대로 이으면
+# 중간에 지연/패딩 구간이 남아 타이밍이 밀리므로 concat_mp3는 None을 돌려주고 호출 측이 기존 디코딩 경로를 쓴다.
+
+# MPEG 버전 비트 -> (이름, 샘플레이트 배율)
+_VERSIONS = {0b11: ("1", 1), 0b10: ("2", 2), 0b00: ("2.5", 4)}
+_SAMPLE_RATES = (44100, 48000, 32000)
+# Layer III 비트레이트 (kbps)
+_BITRATES_V1 = (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320)
+_BITRATES_V2 = (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160)
+_TRAILING_TAGS = (b"TAG", b"APETAGEX", b"LYRICSBEGIN")
+
+
+def _parse_header(data, pos):
+    """pos의 Layer III 프레임 헤더 -> dict (아니면 None)"""
+    if pos + 4 > len(data) or data[pos] != 0xFF or (data[pos + 1] & 0xE0) != 0xE0:
+        return None
+    b1, b2, b3 = data[pos + 1], data[pos + 2], data[pos + 3]
+    version = _VERSIONS.get((b1 >> 3) & 0b11)
+    layer = (b1 >> 1) & 0b11
+    bitrate_idx, sr_idx = b2 >> 4, (b2 >> 2) & 0b11
+    if version is None or layer != 0b01 or bitrate_idx in (0, 15) or sr_idx == 3:
+        return None  # Layer III 가 아니거나 free-format / 잘못된 값
+    name, sr_div = version
+    mpeg1 = name == "1"
+    sample_rate = _SAMPLE_RATES[sr_idx] // sr_div
+    bitrate = (_BITRATES_V1 if mpeg1 else _BITRATES_V2)[bitrate_idx] * 1000
+    mono = (b3 >> 6) == 0b11
+    return {
+        "version": name,
+        "sample_rate": sample_rate,
+        "channels": 1 if mono else 2,
+        "samples": 1152 if mpeg1 else 576,
+        "length": (144 if mpeg1 else 72) * bitrate // sample_rate + ((b2 >> 1) & 1),
+        "side_info": (17 if mono else 32) if mpeg1 else (9 if mono else 17),
+        "crc": not (b1 & 1),
+    }
+
+
+def _id3v2_size(data):
+    if len(data) < 10 or data[:3] != b"ID3":
+        return 0
+    size = (data[6] << 21) | (data[7] << 14) | (data[8] << 7) | data[9]
+    return 10 + size + (10 if data[5] & 0x10 else 0)
+
+
+def _gapless_trim(data, xing_at):
+    """Xing/Info 헤더 뒤 LAME 확장의 (인코더 지연, 패딩) 샘플 수. ffmpeg와 같이 LAME/Lavf/Lavc 태그만 인정."""
+    flags = int.from_bytes(data[xing_at + 4:xing_at + 8], "big")
+    # 프레임 수(1) / 바이트 수(2) / TOC(4) / 품질(8) 필드가 플래그에 따라 있음
+    tag_at = xing_at + 8 + 4 * bool(flags & 1) + 4 * bool(flags & 2) + 100 * bool(flags & 4) + 4 * bool(flags & 8)
+    if data[tag_at:tag_at + 4] not in (b"LAME", b"Lavf", b"Lavc") or tag_at + 24 > len(data):
+        return 0, 0
+    b0, b1, b2 = data[tag_at + 21:tag_at + 24]
+    return (b0 << 4) | (b1 >> 4), ((b1 & 0x0F) << 8) | b2
+
+
+def scan_mp3(path):
+    """프레임 헤더만 읽어서 {"sample_rate", "channels", "version", "frames", "samples", "duration",
+    "gapless", "start", "end"}. samples/duration은 ffmpeg(pydub)가 디코딩했을 때와 같은 값,
+    start/end는 오디오 프레임 바이트 범위. Layer III 가 아니거나(VBRI 헤더 포함) 프레임 사이에
+    알 수 없는 데이터가 있거나 마지막 프레임이 잘렸으면 None."""
+    with open(path, "rb") as f:
+        data = f.read()
+    pos = _id3v2_size(data)
+    first = _parse_header(data, pos)
+    if first is None or data[pos + 36:pos + 40] == b"VBRI":
+        return None
+
+    # 첫 프레임이 Xing/Info 헤더면 갭리스 정보가 있는 파일 (그 프레임은 디코딩되지 않음)
+    xing_at = pos + 4 + (2 if first["crc"] else 0) + first["side_info"]
+    gapless = data[xing_at:xing_at + 4] in (b"Xing", b"Info")
+    delay, padding = _gapless_trim(data, xing_at) if gapless else (0, 0)
+
+    start, frames = pos, 0
+    while pos < len(data):
+        header = _parse_header(data, pos)
+        if header is None:
+            if data[pos:pos + 11].startswith(_TRAILING_TAGS):
+                break
+            return None
+        if (header["version"], header["sample_rate"], header["channels"]) != \
+                (first["version"], first["sample_rate"], first["channels"]) or pos + header["length"] > len(data):
+            return None
+        pos += header["length"]
+        frames += 1
+    samples = max(0, (frames - gapless) * first["samples"] - delay - padding)
+    return {
+        "sample_rate": first["sample_rate"],
+        "channels": first["channels"],
+        "version": first["version"],
+        "frames": frames,
+        "samples": samples,
+        "duration": samples / first["sample_rate"],
+        "gapless": gapless,
+        "start": start,
+        "end": pos,
+    }
+
+
+def mp3_duration(path):
+    """디코딩 없이 구한 길이(초). 프레임 헤더로 알 수 없는 파일이면 None."""
+    info = scan_mp3(path)
+    return info["duration"] if info else None
+
+
+def concat_mp3(paths, output_path):
+    """모든 파일이 같은 형식(버전/샘플레이트/채널)이고 갭리스 헤더가 없으면 프레임 바이트를 이어 붙여
+    output_path에 쓰고 파일별 길이(초) 목록을 돌려준다. 조건이 안 맞으면 None (아무것도 쓰지 않음)."""
+    infos = [scan_mp3(p) for p in paths]
+    if not infos or any(i is None or i["gapless"] for i in infos):
+        return None
+    if len({(i["version"], i["sample_rate"], i["channels"]) for i in infos}) != 1:
+        return None
+
+    out_dir = os.path.dirname(output_path) or "."
+    os.makedirs(out_dir, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=out_dir, suffix=".tmp.mp3")
+    try:
+        with os.fdopen(fd, "wb") as out:
+            for path, info in zip(paths, infos):
+                with open(path, "rb") as f:
+                    f.seek(info["start"])
+                    out.write(f.read(info["end"] - info["start"]))
+        os.replace(tmp_path, output_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return [i["duration"] for i in infos]
+
+
+class Mp3FrameParser:
+    """청크 단위로 들어오는 mp3 바이트에서 완성된 오디오 프레임만 골라내는 증분 파서 (스트리밍 TTS 조립용).
+    feed(chunk)는 이번 청크로 완성된 프레임 바이트를 돌려주고, 길이는 scan_mp3와 같은 규칙으로 누적한다.
+    갭리스(Xing/Info)/VBRI 헤더, 형식이 바뀌는 프레임, 알 수 없는 데이터, 잘린 마지막 프레임은 error에 기록
+    (이후 입력은 무시 -> 호출 측에서 concat_mp3/디코딩 경로로 폴백)."""
+
+    def __init__(self):
+        self.buffer = bytearray()
+        self.format = None  # (version, sample_rate, channels)
+        self.frames = 0
+        self.samples = 0
+        self.error = None
+        self._id3_checked = False
+        self._skip = 0
+        self._trailing = False
+
+    @property
+    def duration(self):
+        return self.samples / self.format[1] if self.format else 0.0
+
+    def feed(self, chunk):
+        if self.error or self._trailing:
+            return b""
+        self.buffer += chunk
+        if not self._id3_checked:
+            if len(self.buffer) < 10:
+                return b""
+            self._skip = _id3v2_size(bytes(self.buffer[:10]))
+            self._id3_checked = True
+        if self._skip:
+            n = min(self._skip, len(self.buffer))
+            del self.buffer[:n]
+            self._skip -= n
+            if self._skip:
+                return b""
+
+        data, pos = self.buffer, 0
+        while pos + 4 <= len(data):
+            header = _parse_header(data, pos)
+            if header is None:
+                rest = bytes(data[pos:pos + 11])
+                if rest.startswith(_TRAILING_TAGS):
+                    self._trailing = True
+                elif not any(tag.startswith(rest) for tag in _TRAILING_TAGS):  # 태그 앞부분만 온 게 아니면
+                    self.error = f"프레임 헤더가 아닌 데이터 (frame {self.frames})"
+                break
+            if pos + header["length"] > len(data):
+                break  # 프레임 나머지가 아직 안 옴
+            fmt = (header["version"], header["sample_rate"], header["channels"])
+            if self.format is None:
+                xing_at = pos + 4 + (2 if header["crc"] else 0) + header["side_info"]
+                if data[xing_at:xing_at + 4] in (b"Xing", b"Info") or data[pos + 36:pos + 40] == b"VBRI":
+                    self.error = "갭리스/VBR 헤더가 있는 스트림"
+                    break
+                self.format = fmt
+            elif fmt != self.format:
+                self.error = f"형식이 바뀌는 프레임 (frame {self.frames})"
+                break
+            pos += header["length"]
+            self.frames += 1
+            self.samples += header["samples"]
+
+        frames = bytes(data[:pos])
+        del data[:pos]
+        return b"" if self.error else frames
+
+    def finish(self):
+        """입력 끝. 남은 바이트가 꼬리 태그가 아니면(잘린 프레임) error. 정상이면 True."""
+        if not self.error and not self._trailing and (self.buffer or self.format is None):
+            self.error = "잘린 마지막 프레임" if self.buffer else "오디오 프레임 없음"
+        return self.error is None
@@ -0,0 +1,73 @@
+import os
+import json
+import shutil
+from disk_cache import DiskCache, file_digest, key_digest
+from encoder_profiles import get_encoder_profile
+from ffmpeg_renderer import FONTS_DIR
+
+# 렌더 결과 캐시 (assets/cache/renders)
+# 렌더 입력(이미지/오디오/BGM/자막 파일 내용, 세그먼트, 제목, 렌더러, 인코더 프로파일, 모션 시드)의
+# 해시가 같으면 이전에 만든 mp4를 그대로 복사해 쓴다.
+# 업로드 단계에서 실패한 잡을 다시 돌릴 때 같은 영상을 처음부터 다시 렌더링하지 않기 위함.
+# 렌더 코드 파일과 폰트 파일 내용도 키에 들어가서, 코드(레이아웃 상수 포함)나 폰트가 바뀌면 자동으로 새로 렌더링한다.
+
+RENDER_CACHE_MAX_BYTES = 4 * 1024 * 1024 * 1024
+RENDER_CACHE_VERSION = 2  # 코드 밖의 이유(ffmpeg 바이너리 교체 등)로 결과가 달라질 때 올려서 기존 캐시 무효화
+# 렌더 결과를 결정하는 모듈 (이 파일들 내용 해시가 키에 들어감)
+RENDER_CODE_FILES = (
+    "video_maker.py", "ffmpeg_renderer.py", "motion_engine.py", "image_cache.py",
+    "text_raster.py", "text_metrics.py", "encoder_profiles.py",
+)
+_CODE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+_cache = DiskCache("renders", RENDER_CACHE_MAX_BYTES)
+
+
+def content_id(path):
+    """입력 파일 내용 해시 (없으면 None)"""
+    return file_digest(path) if path and os.path.exists(path) else None
+
+
+def encoder_id(encoder):
+    """프로파일 이름이 같아도 설정이 바뀌면 다른 키가 되도록 설정 dict 자체를 키에 넣는다"""
+    return get_encoder_profile(encoder)
+
+
+def code_id():
+    """렌더 코드 파일 내용 해시 (file_digest 메모 덕분에 파일이 안 바뀌었으면 stat만)"""
+    return key_digest(*[content_id(os.path.join(_CODE_DIR, name)) for name in RENDER_CODE_FILES])
+
+
+def fonts_id(fonts_dir=FONTS_DIR):
+    """제목/본문/ASS 자막이 쓰는 폰트 폴더의 (파일 이름, 내용 해시) 목록"""
+    if not os.path.isdir(fonts_dir):
+        return None
+    paths = [(name, os.path.join(fonts_dir, name)) for name in sorted(os.listdir(fonts_dir))]
+    return [(name, content_id(path)) for name, path in paths if os.path.isfile(path)]
+
+
+def render_key(kind, parts):
+    return key_digest(RENDER_CACHE_VERSION, code_id(), fonts_id(), kind,
+                      json.dumps(parts, sort_keys=True, ensure_ascii=False))
+
+
+def cached_render(kind, parts, save_path, render, extra_paths=()):
+    """parts 해시가 같은 결과가 캐시에 있으면 save_path로 복사, 없으면 render() 결과를 캐시에 저장.
+    render 는 결과 파일 경로(실패 시 None)를 돌려줘야 한다.
+    extra_paths: 같은 렌더에서 함께 만들어지는 추가 출력(포맷별 파일). 전부 있어야 히트."""
+    key = render_key(kind, parts)
+    outputs = [(".mp4", save_path)] + [(f".{i}.mp4", p) for i, p in enumerate(extra_paths, 1)]
+    hits = [_cache.get(key, suffix) for suffix, _ in outputs]
+    if all(hits):
+        for hit, (_, path) in zip(hits, outputs):
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            shutil.copyfile(hit, path)
+            print(f"♻️ 렌더 캐시 재사용: {path}")
+        return save_path
+
+    result = render()
+    if result and os.path.exists(result) and all(os.path.exists(p) for _, p in outputs[1:]):
+        _cache.put_file(key, ".mp4", result)
+        for suffix, path in outputs[1:]:
+            _cache.put_file(key, suffix, path)
+    return result
@@ -109,8 +109,21 @@ def run_job(job: Dict[str, Any], personas: List[Dict[str, Any]]) -> Dict[str, An
     tts_provider = job.get('tts_provider', 'elevenlabs')  # elevenlabs|polly
     tts_template = job.get('tts_template', 'korean_female')
     polly_voice_key = job.get('polly_voice_key', 'Seoyeon')
+    tts_concurrency = job.get('tts_concurrency')  # 라인별 TTS 동시 요청 수 (없으면 프로바이더 기본값)
+    tts_cache = job.get('tts_cache', True)  # 같은 문장/보이스/설정이면 이전 음성 재사용 (assets/cache/tts)
+    tts_mode = job.get('tts_mode', 'per_line')  # per_line|batch|stream (batch: 전체 스크립트 1회 요청 + 프로바이더 타임스탬프, stream: 받는 대로 병합)
     subtitle_lang = job.get('subtitle_lang', 'ko')
     bgm_path = job.get('bgm_path') or ''
+    renderer = job.get('renderer', 'moviepy')  # moviepy|ffmpeg|ffmpeg_parallel|pipe
+    encoder = job.get('encoder_profile')  # publish|fast|draft (없으면 x264 기본값)
+    render_cache = job.get('render_cache', True)  # 같은 입력이면 이전 렌더 결과 재사용 (assets/cache/renders)
+    motion_seed = job.get('motion_seed')  # 없으면 입력 내용에서 유도
+    single_pass = job.get('single_pass', False)  # True면 자막을 본 인코딩에서 함께 구움 (temp.mp4 없음)
+    hold_static = job.get('hold_static_frames', False)  # 고정 구간을 VFR hold 프레임으로 (ffmpeg 계열 렌더러)
+    output_formats = job.get('output_formats')  # [[w, h], ...] 한 번 합성해서 포맷별 파일로 (첫 포맷이 final.mp4)
+    if output_formats:
+        # 자막을 split 전에 구워야 하므로 ffmpeg 계열은 한 번에, moviepy는 add_subtitles_to_video에서 분기
+        single_pass = renderer != 'moviepy'
     out_dir = job.get('out_dir', 'assets/auto')
     os.makedirs(out_dir, exist_ok=True)
 
@@ -139,7 +152,7 @@ def run_job(job: Dict[str, Any], personas: List[Dict[str, Any]]) -> Dict[str, An
     if style != 'emotional' and include_voice:
         prov = 'elevenlabs' if tts_provider.lower().startswith('eleven') else 'polly'
         template = tts_template if prov == 'elevenlabs' else polly_voice_key
-        segments, _, _ = generate_subtitle_from_script(
+        segments, audio_clip, _ = generate_subtitle_from_script(
             script_text=script_text,
             ass_path=ass_path,
             full_audio_file_path=full_audio_path,
@@ -147,7 +160,12 @@ def run_job(job: Dict[str, Any], personas: List[Dict[str, Any]]) -> Dict[str, An
             template=template,
             subtitle_lang=subtitle_lang,
             translate_only_if_english=False,
+            tts_concurrency=tts_concurrency,
+            tts_cache=tts_cache,
+            tts_mode=tts_mode,
         )
+        if audio_clip is not None:
+            audio_clip.close()  # 오디오 리더(ffmpeg 자식 프로세스)는 여기서 바로 정리
     else:
         # 무성/감성 텍스트: 길이 기반 더미 세그먼트, 자막(선택)
         sents = [s.strip() for s in re.split(r'(?<=[.!?])\s*', script_text) if s.strip()]
@@ -196,6 +214,11 @@ def run_job(job: Dict[str, Any], personas: List[Dict[str, Any]]) -> Dict[str, An
             audio_path=None,
             bgm_path=bgm_path,
             save_path=temp_video,
+            renderer=renderer,
+            encoder=encoder,
+            cache=render_cache,
+            output_formats=output_formats,
+            hold_static=hold_static,
         )
         final_path = created
     else:
@@ -206,9 +229,19 @@ def run_job(job: Dict[str, Any], personas: List[Dict[str, Any]]) -> Dict[str, An
             topic_title=title,
             include_topic_title=True,
             bgm_path=bgm_path,
-            save_path=temp_video,
+            save_path=final_video if single_pass else temp_video,
+            renderer=renderer,
+            subtitle_path=ass_path if single_pass else None,
+            encoder=encoder,
+            motion_seed=motion_seed,
+            cache=render_cache,
+            output_formats=output_formats if single_pass else None,
+            hold_static=hold_static,
         )
-        final_path = add_subtitles_to_video(created, ass_path, output_path=final_video)
+        final_path = created if single_pass else add_subtitles_to_video(created, ass_path, output_path=final_video,
+                                                                        encoder=encoder, cache=render_cache,
+                                                                        output_formats=output_formats,
+                                                                        hold_static=hold_static)
 
     # 6.6 업로드(옵션)
     youtube_url = None
@@ -0,0 +1,61 @@
+from functools import lru_cache
+from PIL import Image, ImageDraw, ImageFont
+
+# 텍스트 폭 측정 서비스
+# TextClip을 통째로 만들어 .w 만 읽던 측정을 Pillow 폰트 메트릭으로 대체한다.
+# 폰트 객체와 (폰트, 크기, 문자열) -> 폭 결과를 모두 LRU로 캐시해서
+# 래핑/가운데 정렬/본문 피팅 루프에서 같은 측정을 반복하지 않게 한다.
+
+TEXTCLIP_INTERLINE = 4  # moviepy TextClip 기본 interline
+
+# 측정 전용 1x1 캔버스 (그리기 없이 bbox 계산만 함)
+_measure_draw = ImageDraw.Draw(Image.new("RGB", (1, 1)))
+
+
+@lru_cache(maxsize=64)
+def get_font(font_path: str, font_size: int) -> ImageFont.FreeTypeFont:
+    """(폰트 경로, 크기)별 ImageFont 객체 캐시"""
+    return ImageFont.truetype(font_path, font_size)
+
+
+@lru_cache(maxsize=16384)
+def text_width(text: str, font_path: str, font_size: int, stroke_width: int = 0) -> int:
+    """TextClip(method="label")의 .w 와 같은 방식으로 계산한 텍스트 폭(px)"""
+    if not text:
+        return 0
+    left, _, right, _ = _measure_draw.multiline_textbbox(
+        (0, 0), text,
+        font=get_font(font_path, font_size),
+        spacing=TEXTCLIP_INTERLINE,
+        stroke_width=stroke_width,
+        anchor="ls",
+    )
+    return int(right - left)
+
+
+def wrap_to_width(text: str, max_w: int, font_path: str, font_size: int):
+    """단어 단위 래핑"""
+    words = text.split()
+    lines, cur = [], ""
+    for w in words:
+        test = (cur + " " + w).strip()
+        if not cur or text_width(test, font_path, font_size) <= max_w:
+            cur = test
+        else:
+            lines.append(cur)
+            cur = w
+    if cur:
+        lines.append(cur)
+    return lines if lines else [""]
+
+
+def wrap_preserving_newlines(text: str, max_w: int, font_path: str, font_size: int):
+    """입력 줄바꿈 보존 + 블록별 래핑 (빈 줄 유지)"""
+    out = []
+    for block in (text or "").splitlines():
+        if block.strip() == "":
+            out.append("")
+        else:
+            out.extend(wrap_to_width(block, max_w, font_path, font_size))
+    return out
+
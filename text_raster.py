@@ -0,0 +1,70 @@
+from functools import lru_cache
+import numpy as np
+from PIL import Image, ImageDraw
+from text_metrics import get_font, text_width, TEXTCLIP_INTERLINE
+
+# Pillow 텍스트 래스터라이저
+# 제목/본문마다 TextClip을 만들고 CompositeVideoClip으로 합성해서 프레임을 뽑던 것을
+# 캐시된 ImageFont로 줄 위치를 미리 계산(layout_lines)한 뒤 캔버스에 바로 그리는 방식으로 대체한다.
+# 레이아웃은 폰트 메트릭만으로 계산되므로 본문 피팅 루프에서 시험 렌더링이 필요 없다.
+# 가운데/왼쪽 정렬은 줄 폭으로 직접 맞추므로 NBSP 패딩이나 하단 잘림 방지용 개행 같은 보정도 필요 없다.
+
+# 측정 전용 1x1 캔버스
+_measure_draw = ImageDraw.Draw(Image.new("RGB", (1, 1)))
+
+
+@lru_cache(maxsize=256)
+def line_height(font_path: str, font_size: int, stroke_width: int = 0) -> int:
+    """한 줄이 차지하는 높이(px): ascent + descent + 위아래 외곽선"""
+    ascent, descent = get_font(font_path, font_size).getmetrics()
+    return ascent + descent + stroke_width * 2
+
+
+@lru_cache(maxsize=256)
+def line_advance(font_path: str, font_size: int, spacing: int = TEXTCLIP_INTERLINE, stroke_width: int = 0) -> int:
+    """Pillow multiline_text(= TextClip label)와 같은 줄 간격(px)"""
+    font = get_font(font_path, font_size)
+    return int(_measure_draw.textbbox((0, 0), "A", font, stroke_width=stroke_width)[3] + stroke_width + spacing)
+
+
+def layout_lines(lines, font_path, font_size, stroke_width=0, advance=None, blank_advance=None):
+    """줄 목록의 위치를 폰트 메트릭으로 계산.
+    advance: 글자 줄 간격(기본: line_advance), blank_advance: 빈 줄 간격(기본: advance).
+    반환: {"lines": [(텍스트, 폭, 줄 윗변 y)], "width": 최대 폭, "height": 블록 높이}"""
+    if advance is None:
+        advance = line_advance(font_path, font_size, stroke_width=stroke_width)
+    if blank_advance is None:
+        blank_advance = advance
+    placed, y, width = [], 0, 0
+    for i, line in enumerate(lines):
+        w = text_width(line, font_path, font_size, stroke_width) if line.strip() else 0
+        placed.append((line, w, y))
+        width = max(width, w)
+        if i < len(lines) - 1:
+            y += advance if line.strip() else blank_advance
+    height = y + line_height(font_path, font_size, stroke_width) if placed else 0
+    return {"lines": placed, "width": width, "height": height}
+
+
+def draw_layout(draw, layout, x, y, font_path, font_size, fill="white", stroke_fill=None, stroke_width=0,
+                align="left"):
+    """layout_lines 결과를 ImageDraw 캔버스의 (x, y)에 그린다. align: "left" 또는 "center" (블록 폭 기준)"""
+    font = get_font(font_path, font_size)
+    ascent, _ = font.getmetrics()
+    for text, w, top in layout["lines"]:
+        if not text.strip():
+            continue
+        lx = x + (round((layout["width"] - w) / 2) if align == "center" else 0)
+        # TextClip과 같은 기준점: 외곽선 두께만큼 안쪽, 베이스라인 = 윗변 + ascent
+        draw.text((lx + stroke_width, y + top + ascent + stroke_width), text, font=font, fill=fill,
+                  anchor="ls", stroke_width=stroke_width, stroke_fill=stroke_fill)
+
+
+def render_layout(layout, font_path, font_size, fill="white", stroke_fill=None, stroke_width=0, align="left",
+                  pad_top=0, pad_bottom=0):
+    """layout 블록만 투명 배경 RGBA NumPy 배열로 래스터화 (크기: 블록 폭 x 패딩 포함 높이)"""
+    size = (max(1, layout["width"]), max(1, pad_top + layout["height"] + pad_bottom))
+    canvas = Image.new("RGBA", size, (0, 0, 0, 0))
+    draw_layout(ImageDraw.Draw(canvas), layout, 0, pad_top, font_path, font_size, fill, stroke_fill, stroke_width,
+                align)
+    return np.asarray(canvas)
@@ -0,0 +1,134 @@
+import os
+import re
+import json
+import shutil
+import threading
+import unicodedata
+from disk_cache import DiskCache, key_digest
+from elevenlabs_tts import (
+    generate_tts, generate_tts_with_timestamps, stream_tts_to_file, TTS_ELEVENLABS_TEMPLATES, TTS_POLLY_VOICES, ELEVEN_MODEL_ID,
+    POLLY_ENGINE, POLLY_DEFAULT_VOICE,
+)
+
+# TTS 음성 캐시 (assets/cache/tts)
+# (프로바이더, 보이스 ID, 음성 설정, 모델, 정규화한 문장)이 같으면 이전에 받은 mp3를 그대로 복사해 쓴다.
+# 반복되는 훅 문장, 실패한 잡 재실행, 재렌더링에서 ElevenLabs/Polly를 다시 호출하지 않기 위함.
+
+TTS_CACHE_MAX_BYTES = 512 * 1024 * 1024
+TTS_CACHE_VERSION = 1  # 음성 결과가 달라지는 코드 변경 시 올려서 기존 캐시 무효화
+
+_cache = DiskCache("tts", TTS_CACHE_MAX_BYTES)
+_stats_lock = threading.Lock()
+
+
+def normalize_text(text):
+    """유니코드 정규화(NFC) + 공백 정리. 보이는 문장이 같으면 같은 키가 되도록"""
+    return re.sub(r"\s+", " ", unicodedata.normalize("NFC", text or "")).strip()
+
+
+def voice_params(provider, template_name="default", voice_id=None, polly_voice_name_key="korean_female1"):
+    """generate_tts가 실제로 요청에 쓰는 보이스/설정 값 (템플릿 이름이 아니라 해석된 값)"""
+    if provider == "elevenlabs":
+        settings = TTS_ELEVENLABS_TEMPLATES.get(template_name, TTS_ELEVENLABS_TEMPLATES["default"])
+        return {
+            "voice_id": voice_id or settings["voice_id"],
+            "model_id": ELEVEN_MODEL_ID,
+            "stability": settings["stability"],
+            "similarity_boost": settings["similarity_boost"],
+            "style": settings["style"],
+            "speed": settings["speed_multiplier"],
+        }
+    if provider == "polly":
+        return {
+            "voice_id": TTS_POLLY_VOICES.get(polly_voice_name_key, POLLY_DEFAULT_VOICE),
+            "engine": POLLY_ENGINE,
+            "format": "mp3",
+        }
+    raise ValueError(f"Unsupported TTS provider: {provider}. Choose 'elevenlabs' or 'polly'.")
+
+
+def tts_key(provider, text, **voice):
+    params = voice_params(provider, **voice)
+    return key_digest(TTS_CACHE_VERSION, provider, json.dumps(params, sort_keys=True), normalize_text(text))
+
+
+def cached_tts(text, save_path, provider, template_name="default", voice_id=None,
+               polly_voice_name_key="korean_female1"):
+    """generate_tts 앞단 캐시. 히트하면 네트워크 없이 save_path로 복사, 미스면 생성 후 캐시에 저장."""
+    key = tts_key(provider, text, template_name=template_name, voice_id=voice_id,
+                  polly_voice_name_key=polly_voice_name_key)
+    with _stats_lock:
+        hit = _cache.get(key, ".mp3")
+    if hit:
+        os.makedirs(os.path.dirname(save_path) or ".", exist_ok=True)
+        shutil.copyfile(hit, save_path)
+        print(f"♻️ TTS 캐시 재사용: {save_path}")
+        return save_path
+
+    result = generate_tts(text, save_path=save_path, provider=provider, template_name=template_name,
+                          voice_id=voice_id, polly_voice_name_key=polly_voice_name_key)
+    if result and os.path.exists(result):
+        _cache.put_file(key, ".mp3", result)
+    return result
+
+
+def cached_tts_stream(text, save_path, provider, template_name="default", voice_id=None,
+                      polly_voice_name_key="korean_female1", on_progress=None):
+    """stream_tts_to_file 앞단 캐시 (cached_tts와 같은 키: 스트리밍 응답도 같은 mp3).
+    히트면 save_path로 복사 후 on_progress(파일 크기) 한 번, 미스면 스트리밍으로 받고 캐시에 저장."""
+    key = tts_key(provider, text, template_name=template_name, voice_id=voice_id,
+                  polly_voice_name_key=polly_voice_name_key)
+    with _stats_lock:
+        hit = _cache.get(key, ".mp3")
+    if hit:
+        os.makedirs(os.path.dirname(save_path) or ".", exist_ok=True)
+        shutil.copyfile(hit, save_path)
+        print(f"♻️ TTS 캐시 재사용: {save_path}")
+        if on_progress:
+            on_progress(os.path.getsize(save_path))
+        return save_path
+
+    result = stream_tts_to_file(text, save_path, provider, template_name=template_name, voice_id=voice_id,
+                                polly_voice_name_key=polly_voice_name_key, on_progress=on_progress)
+    _cache.put_file(key, ".mp3", result)
+    return result
+
+
+def cached_tts_with_timestamps(lines, save_path, provider, template_name="default", voice_id=None,
+                               polly_voice_name_key="korean_female1"):
+    """generate_tts_with_timestamps 앞단 캐시. 음성(.mp3)과 라인 시작 시각(.json)을 함께 저장/복원."""
+    voice = dict(template_name=template_name, voice_id=voice_id, polly_voice_name_key=polly_voice_name_key)
+    key = key_digest(TTS_CACHE_VERSION, "timestamps", provider,
+                     json.dumps(voice_params(provider, **voice), sort_keys=True),
+                     json.dumps([normalize_text(l) for l in lines], ensure_ascii=False))
+    hit_starts = _cache.path_for(key, ".json")  # 음성과 같이 저장되는 사이드카 (통계는 음성 기준 1회)
+    with _stats_lock:
+        if os.path.exists(hit_starts):
+            hit_audio = _cache.get(key, ".mp3")
+        else:
+            _cache.misses += 1  # 사이드카가 없으면 음성이 있어도 다시 합성하므로 미스
+            hit_audio = None
+    if hit_audio:
+        os.utime(hit_starts)  # 사이드카도 LRU 순서 갱신 (음성보다 먼저 지워지지 않게)
+        os.makedirs(os.path.dirname(save_path) or ".", exist_ok=True)
+        shutil.copyfile(hit_audio, save_path)
+        with open(hit_starts, encoding="utf-8") as f:
+            line_starts = json.load(f)
+        print(f"♻️ TTS 캐시 재사용: {save_path} ({len(lines)}줄)")
+        return line_starts
+
+    line_starts = generate_tts_with_timestamps(lines, save_path, provider, **voice)
+    _cache.put_file(key, ".mp3", save_path)
+    _cache.put(key, ".json", lambda tmp: _write_json(tmp, line_starts))
+    return line_starts
+
+
+def _write_json(path, data):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+
+
+def cache_stats():
+    """프로세스 시작 이후 TTS 캐시 히트/미스 수"""
+    with _stats_lock:
+        return {"hits": _cache.hits, "misses": _cache.misses}
@@ -1,136 +1,35 @@
 from moviepy import (
     ImageClip, AudioFileClip, concatenate_videoclips,
-    CompositeVideoClip, TextClip, ColorClip, CompositeAudioClip
+    CompositeVideoClip
 )
 import os
-import random
 import subprocess
+import tempfile
+from contextlib import ExitStack
+from functools import lru_cache
 import numpy as np
+from PIL import Image, ImageDraw
 from moviepy.audio.AudioClip import AudioArrayClip
 import imageio_ffmpeg
+from ffmpeg_renderer import mix_audio_track, render_segments_ffmpeg, render_segments_parallel, render_segments_pipe, render_still_image, ass_filter, output_args, output_targets, frame_rate_args
+from render_cache import cached_render, content_id, encoder_id
+from disk_cache import key_digest
+from encoder_profiles import x264_args, scale_filter, moviepy_write_options
+from motion_engine import make_motion_clip, plan_motions, motion_for_segment
+from text_metrics import text_width, wrap_to_width, wrap_preserving_newlines
+from text_raster import layout_lines, line_height, draw_layout, render_layout
+
+TITLE_FONT_PATH = os.path.join("assets", "fonts", "Pretendard-Bold.ttf")
+TITLE_FONT_SIZE = 48
+
+def create_motion_clip(img_path, duration, width, height, motion_type=None, seed=None, index=0):
+    # 이미지를 '커버' 크기로 한 번만 리샘플하고 프레임마다 크롭 박스만 계산하는 엔진 사용
+    # (줌: 서브픽셀 크롭 + 고정 크기 리사이즈, 패닝/고정: 정수 크롭)
+    # motion_type이 없으면 (seed, index)로 결정 (seed가 없으면 이미지 내용 해시를 시드로)
+    if motion_type is None:
+        motion_type = motion_for_segment(content_id(img_path) if seed is None else seed, index)
+    return make_motion_clip(img_path, duration, width, height, motion_type).with_position((0, 0))
 
-def create_motion_clip(img_path, duration, width, height):
-    base_clip_original_size = ImageClip(img_path)
-
-    # 이미지 초기 리사이징 전략 변경: '커버' 방식으로 항상 화면을 가득 채움
-    scale_w = width / base_clip_original_size.w
-    scale_h = height / base_clip_original_size.h
-    
-    # 두 스케일 중 더 큰 값을 선택하여, 이미지가 비디오 프레임을 완전히 덮도록 함
-    scale_factor_cover = max(scale_w, scale_h)
-    
-    # Round를 사용하여 소수점 처리 오류 방지, 최소 크기 1 보장
-    resized_w_cover = max(1, round(base_clip_original_size.w * scale_factor_cover))
-    resized_h_cover = max(1, round(base_clip_original_size.h * scale_factor_cover))
-
-    # 새로운 '커버' 방식으로 리사이즈된 base_clip 생성
-    base_clip = base_clip_original_size.resized((resized_w_cover, resized_h_cover)).with_duration(duration)
-
-    clip_width = base_clip.w
-    clip_height = base_clip.h
-
-    motion_type = random.choice(["zoom_in_out", "left_to_right", "right_to_left", "static"])
-
-    # 중앙 정렬을 위한 기본 위치
-    center_x = round((width - clip_width) / 2)
-    center_y = round((height - clip_height) / 2)
-
-    if motion_type == "zoom_in_out":
-        start_scale = 1.0
-        end_scale = 1.05
-        scale_diff = end_scale - start_scale
-
-        # 화면에 꽉 채우도록 커버 리사이즈 먼저 진행
-        scale_w = width / base_clip_original_size.w
-        scale_h = height / base_clip_original_size.h
-        base_scale = max(scale_w, scale_h)
-
-        base_clip = base_clip_original_size.resized(base_scale).with_duration(duration)
-
-        def zoom_factor(t):
-            return start_scale + scale_diff * (t / duration)
-
-        def position(t):
-            scale = zoom_factor(t)
-            w_scaled = base_clip.w * scale
-            h_scaled = base_clip.h * scale
-            x = round((width - w_scaled) / 2)
-            y = round((height - h_scaled) / 2)
-            # y가 음수면 0으로 보정해서 아래 검은 여백 방지
-            if y < 0:
-                y = 0
-            return (x, y)
-
-        zoomed_clip = base_clip.resized(zoom_factor).with_position(position)
-
-        return zoomed_clip
-
-
-    elif motion_type == "left_to_right":
-        if clip_width > width:
-            max_move = clip_width - width
-
-            # 💡 차이가 아주 작으면 거의 고정 (예: 30픽셀 이하)
-            if max_move < 30:
-                return base_clip.with_position((center_x, center_y))
-
-            start_ratio = 0.3
-            end_ratio = 0.6
-            move_ratio = end_ratio - start_ratio
-
-            start_offset = -max_move * start_ratio
-            move_distance = max_move * move_ratio
-
-            def ease_in_out(t):
-                progress = t / duration
-                return 3 * (progress ** 2) - 2 * (progress ** 3)
-
-            def position(t):
-                eased = ease_in_out(t)
-                x = round(start_offset + move_distance * eased)
-                y = center_y
-                return (x, y)
-
-            return base_clip.with_position(position)
-        else:
-            return base_clip.with_position((center_x, center_y))
-
-
-    elif motion_type == "right_to_left":
-        if clip_width > width:
-            max_move = clip_width - width
-
-            # 💡 차이가 아주 작으면 거의 고정
-            if max_move < 30:
-                return base_clip.with_position((center_x, center_y))
-
-            start_ratio = 0.3
-            end_ratio = 0.6
-            move_ratio = end_ratio - start_ratio
-
-            start_offset = -max_move * end_ratio
-            move_distance = max_move * move_ratio
-
-            def ease_in_out(t):
-                progress = t / duration
-                return 3 * (progress ** 2) - 2 * (progress ** 3)
-
-            def position(t):
-                eased = ease_in_out(t)
-                x = round(start_offset - move_distance * eased)
-                y = center_y
-                return (x, y)
-
-            return base_clip.with_position(position)
-        else:
-            return base_clip.with_position((center_x, center_y))
-
-
-    else: # "static" (고정)
-        # 이미지가 프레임 중앙에 고정되어 잘리지 않고 보여집니다.
-        # round()를 사용하여 소수점 처리 오류 방지
-        return base_clip.with_position((center_x, center_y))
-    
 def auto_split_title(text: str, max_first_line_chars=18):
     words = text.split()
     total_chars = sum(len(w) for w in words)
@@ -148,9 +47,104 @@ def auto_split_title(text: str, max_first_line_chars=18):
         return text, ""  # 한 줄
     return " ".join(words[:split_idx]), " ".join(words[split_idx:])
 
+# ✅ 상단 타이틀바(검은 바 + 가운데 정렬 제목)를 RGBA 이미지 한 장으로 래스터화
+# 제목은 영상 내내 바뀌지 않으므로 (제목, 폰트, 크기, 폭) 기준으로 캐시해서 세그먼트/영상 간에 재사용
+@lru_cache(maxsize=32)
+def render_title_overlay(topic_title, video_width, font_path=TITLE_FONT_PATH, font_size=TITLE_FONT_SIZE):
+    max_title_width = video_width - 40  # 좌우 여백
+    stroke_width = 1
+    lines = []
+    for block in auto_split_title(topic_title):
+        if block.strip():
+            lines += wrap_to_width(block, max_title_width, font_path, font_size)
+    layout = layout_lines(lines or [""], font_path, font_size, stroke_width=stroke_width)
+
+    # 동적 타이틀바 높이 (바는 화면 맨 위)
+    pad_y = 16
+    title_bar_height = layout["height"] + pad_y * 2
+
+    # 텍스트 블록 높이가 메트릭 그대로라(하단 잘림 방지용 개행 없음) 바 안에서 그대로 세로 가운데
+    x = round((video_width - layout["width"]) / 2)
+    text_offset_y = 0  # ↓ 원하는 만큼 조절 (양수면 아래로, 음수면 위로)
+    y = round((title_bar_height - layout["height"]) / 2) + text_offset_y
+    # 바 밖으로 나가지 않도록 클램프
+    y = max(0, min(y, title_bar_height - layout["height"]))
+
+    canvas = Image.new("RGBA", (video_width, title_bar_height), (0, 0, 0, 255))
+    draw_layout(ImageDraw.Draw(canvas), layout, x, y, font_path, font_size,
+                fill="white", stroke_fill="skyblue", stroke_width=stroke_width, align="center")
+    rgba = np.asarray(canvas)
+    rgba.flags.writeable = False  # 캐시 공유 배열이므로 읽기 전용
+    return rgba
+
+# ✅ BGM 믹싱 (두 영상 함수 공용)
+# BGM을 to_soundarray로 통째로 디코딩해 np.tile 하지 않고, ffmpeg 렌더러와 같은
+# 스트리밍 필터(-stream_loop 반복 + volume + amix)로 work_dir에 믹싱한 트랙을 만들어
+# AudioFileClip(버퍼 단위 읽기)으로 붙인다. 메모리 사용량이 BGM 길이와 무관함.
+def mix_bgm(audio, audio_path, bgm_path, duration, work_dir):
+    if not bgm_path or not os.path.exists(bgm_path):
+        return audio
+    mixed_path = mix_audio_track(
+        audio_path if audio_path and os.path.exists(audio_path) else None,
+        bgm_path, duration, os.path.join(work_dir, "mixed.wav"),
+    )
+    return AudioFileClip(mixed_path)
+
 # ✅ 영상 생성 메인 함수
 def create_video_with_segments(image_paths, segments, audio_path, topic_title,
-                               include_topic_title=True, bgm_path="", save_path="assets/video.mp4"):
+                               include_topic_title=True, bgm_path="", save_path="assets/video.mp4",
+                               renderer="moviepy", subtitle_path=None, encoder=None,
+                               motion_seed=None, motions=None, cache=False, output_formats=None, hold_static=False):
+    # subtitle_path: 주어지면 별도 자막 패스 없이 이 인코딩 한 번에 ASS 자막을 굽는다
+    # encoder: 인코더 프로파일 이름(publish|fast|draft). 레이아웃은 720x1080 기준, draft는 인코딩 때 축소
+    # motion_seed: 잡 단위 모션 시드. 세그먼트 i의 모션은 (시드, i)로 결정됨 (motion_engine.plan_motions)
+    #              None이면 이미지/타이밍 내용에서 유도 (같은 입력 -> 같은 영상)
+    # motions: 미리 계획한 세그먼트별 모션 목록 (주면 시드 대신 그대로 사용)
+    # cache: True면 입력 내용 해시가 같은 이전 렌더 결과를 재사용 (render_cache)
+    # output_formats: [(w, h), ...] 이면 한 번 합성해서 포맷별 파일을 함께 인코딩 (첫 포맷 -> save_path,
+    #                 나머지 -> save_path_{w}x{h}.mp4). 프로파일 해상도 대신 이 크기들을 쓴다. ffmpeg 계열 렌더러 전용
+    # hold_static: 고정 세그먼트를 24fps 복제 대신 VFR hold 프레임으로 인코딩 (ffmpeg 계열, 자막 동시 굽기 제외)
+
+    # segments 개수에 맞춰 이미지도 1:1로 매칭
+    num_images_needed = len(segments)
+    if len(image_paths) < num_images_needed:
+        # 부족하면 마지막 이미지 반복 사용
+        image_paths += [image_paths[-1]] * (num_images_needed - len(image_paths))
+
+    image_ids = [content_id(p) for p in image_paths[:len(segments)]]
+    timeline = [[seg['start'], seg['end']] for seg in segments]
+    if motion_seed is None:
+        motion_seed = int(key_digest(image_ids, timeline)[:8], 16)
+    if motions is None:
+        motions = plan_motions(motion_seed, len(segments))
+    motions = list(motions[:len(segments)])
+
+    def render():
+        return _render_video_with_segments(
+            image_paths, segments, motions, audio_path, topic_title, include_topic_title,
+            bgm_path, save_path, renderer, subtitle_path, encoder, output_formats, hold_static,
+        )
+
+    if not cache:
+        return render()
+    parts = {
+        "images": image_ids,
+        "segments": [[seg['start'], seg['end'], seg.get('text', '')] for seg in segments],
+        "audio": content_id(audio_path),
+        "title": topic_title if include_topic_title else None,
+        "bgm": content_id(bgm_path),
+        "subtitle": content_id(subtitle_path),
+        "renderer": renderer,
+        "encoder": encoder_id(encoder),
+        "motions": motions,
+        "formats": output_formats,
+        "hold": hold_static,
+    }
+    return cached_render("segments", parts, save_path, render, extra_paths(save_path, output_formats))
+
+def _render_video_with_segments(image_paths, segments, motions, audio_path, topic_title, include_topic_title,
+                                bgm_path, save_path, renderer, subtitle_path, encoder, output_formats=None,
+                                hold_static=False):
     video_width = 720
     video_height = 1080
     clips = []
@@ -163,210 +157,182 @@ def create_video_with_segments(image_paths, segments, audio_path, topic_title,
         # segments가 비어있는 극단적인 경우를 위한 폴백 (최소 10초)
         total_video_duration = 10 
 
-    # 오디오 클립 초기화 (audio_path가 없으면 무음 클립 생성)
-    if audio_path and os.path.exists(audio_path):
-        audio = AudioFileClip(audio_path)
-    else:
-        # 무음 오디오 클립 생성 (moviepy가 None을 처리하지 못하므로)
-        # np.array([[0.0, 0.0]])는 무음 오디오 데이터를 나타냅니다.
-        audio = AudioArrayClip(np.array([[0.0, 0.0]]), fps=44100).with_duration(total_video_duration)
-        print("🔊 음성 파일이 없어 무음 오디오 트랙을 생성했습니다.")
+    # ffmpeg 렌더러: 세그먼트/모션/타이틀/BGM을 하나의 필터 그래프로 컴파일해 ffmpeg 한 번으로 인코딩
+    # ffmpeg_parallel: 세그먼트별 청크를 코어 수만큼 병렬 인코딩 후 스트림 복사로 이어붙임
+    # pipe: 프레임을 NumPy 버퍼에 직접 합성해 ffmpeg 한 프로세스에 rawvideo로 전달 (moviepy 합성 트리 없음)
+    if renderer in ("ffmpeg", "ffmpeg_parallel", "pipe"):
+        title_overlay = render_title_overlay(topic_title, video_width) if include_topic_title else None
+        render = {
+            "ffmpeg": render_segments_ffmpeg,
+            "ffmpeg_parallel": render_segments_parallel,
+            "pipe": render_segments_pipe,
+        }[renderer]
+        render(
+            image_paths[:len(segments)], segments, motions,
+            audio_path=audio_path if audio_path and os.path.exists(audio_path) else None,
+            title_overlay=title_overlay,
+            bgm_path=bgm_path if bgm_path and os.path.exists(bgm_path) else None,
+            save_path=save_path,
+            width=video_width, height=video_height,
+            subtitle_path=subtitle_path,
+            encoder=encoder,
+            output_formats=output_formats,
+            hold_static=hold_static,
+        )
+        print(f"✅ 타이밍 동기화 영상 저장 완료: {save_path}")
+        return save_path
+    elif renderer != "moviepy":
+        raise ValueError(f"Unsupported renderer: {renderer}. Choose 'moviepy', 'ffmpeg', 'ffmpeg_parallel' or 'pipe'.")
+    elif output_formats:
+        raise ValueError("output_formats는 ffmpeg 계열 렌더러에서만 지원합니다. (moviepy는 add_subtitles_to_video에서 분기)")
+
+    # 렌더 한 번에 연 클립(ffmpeg 리더 프로세스를 잡고 있는 오디오 등)은 scope 에 등록해서
+    # 성공/실패와 상관없이 여기서 모두 닫는다 (오래 도는 워커에서 fd/자식 프로세스 누수 방지)
+    with ExitStack() as scope:
+        # 오디오 클립 초기화 (audio_path가 없으면 무음 클립 생성)
+        if audio_path and os.path.exists(audio_path):
+            audio = scope.enter_context(AudioFileClip(audio_path))
+        else:
+            # 무음 오디오 클립 생성 (moviepy가 None을 처리하지 못하므로)
+            # np.array([[0.0, 0.0]])는 무음 오디오 데이터를 나타냅니다.
+            audio = AudioArrayClip(np.array([[0.0, 0.0]]), fps=44100).with_duration(total_video_duration)
+            print("🔊 음성 파일이 없어 무음 오디오 트랙을 생성했습니다.")
 
-    # segments 개수에 맞춰 이미지도 1:1로 매칭
-    num_images_needed = len(segments)
-    if len(image_paths) < num_images_needed:
-        # 부족하면 마지막 이미지 반복 사용
-        image_paths += [image_paths[-1]] * (num_images_needed - len(image_paths))
+        # 타이틀 레이어(바 + 텍스트)는 한 번만 래스터화해서 모든 세그먼트에 재사용
+        title_layer = ImageClip(render_title_overlay(topic_title, video_width)) if include_topic_title else None
 
-    for i, seg in enumerate(segments):
-        start = seg['start']
-        # 각 세그먼트의 duration은 해당 세그먼트의 시작 시간과 끝 시간의 차이로 계산합니다.
-        duration = seg['end'] - start
-
-        img_path = image_paths[i]
-
-        # 이미지 하나당 motion clip 생성
-        image_clip = create_motion_clip(img_path, duration, video_width, video_height)
-
-        current_segment_clips = [image_clip]
-
-        if include_topic_title:
-            font_path = os.path.join("assets", "fonts", "Pretendard-Bold.ttf")
-            line1, line2 = auto_split_title(topic_title)
-            formatted_title = line1 + ("\n" + line2 if line2 else "")
-            max_title_width = video_width - 40  # 좌우 여백
-
-            used_caption = False
-            title_clip = None
-
-            # 1) 가능하면 caption + align="center" 사용
-            try:
-                title_clip = TextClip(
-                    text=formatted_title + "\n",  # 하단 잘림 방지용 개행
-                    font_size=48,
-                    color="white",
-                    font=font_path,
-                    stroke_color="skyblue",
-                    stroke_width=1,
-                    method="caption",
-                    size=(max_title_width, None),
-                    align="center",
-                ).with_duration(duration)
-                used_caption = True
-            except TypeError:
-                title_clip = None  # 폴백 진행
-
-            # 2) 폴백: label 한 개로 만들되 '시각적 가운데' 구현
-            wrapped_lines = None  # dummy 생성 시 재사용
-            if title_clip is None:
-                def line_width(s: str) -> int:
-                    if not s:
-                        return 0
-                    c = TextClip(text=s, font=font_path, font_size=48, method="label")
-                    w = c.w
-                    c.close()
-                    return w
-
-                def wrap_to_width(text: str, max_w: int):
-                    words = text.split()
-                    lines, cur = [], ""
-                    for w in words:
-                        test = (cur + " " + w).strip()
-                        if not cur or line_width(test) <= max_w:
-                            cur = test
-                        else:
-                            lines.append(cur)
-                            cur = w
-                    if cur:
-                        lines.append(cur)
-                    return lines
-
-                wrapped_lines = []
-                for block in formatted_title.split("\n"):
-                    if block.strip():
-                        wrapped_lines += wrap_to_width(block, max_title_width)
-                if not wrapped_lines:
-                    wrapped_lines = [""]
-
-                # 각 줄 폭을 맞춰 '가운데처럼' 보이게 NBSP 패딩
-                maxw = max(line_width(l) for l in wrapped_lines)
-                spacew = max(line_width("\u00A0"), 1)
-                centered_lines = []
-                for l in wrapped_lines:
-                    lw = line_width(l)
-                    pad = int(round((maxw - lw) / (2 * spacew))) if maxw > lw else 0
-                    centered_lines.append("\u00A0" * pad + l)
-
-                final_text = "\n".join(centered_lines) + "\n"  # 하단 잘림 방지용 개행
-                title_clip = TextClip(
-                    text=final_text,
-                    font_size=48,
-                    color="white",
-                    font=font_path,
-                    stroke_color="skyblue",
-                    stroke_width=1,
-                    method="label",
-                ).with_duration(duration)
-                used_caption = False
-
-            # 3) 동적 타이틀바 높이 계산 (그대로)
-            pad_y = 16
-            if used_caption:
-                dummy = TextClip(
-                    text=formatted_title,
-                    font_size=48,
-                    font=font_path,
-                    method="caption",
-                    size=(max_title_width, None),
-                    align="center",
-                )
-            else:
-                dummy_text = "\n".join(wrapped_lines) if wrapped_lines else formatted_title
-                dummy = TextClip(
-                    text=dummy_text,
-                    font_size=48,
-                    font=font_path,
-                    method="label",
-                )
-            title_bar_height = dummy.h + pad_y * 2
-            dummy.close()
-
-            # 바는 화면 맨 위에 그대로 둡니다.
-            black_bar = ColorClip(size=(video_width, title_bar_height), color=(0, 0, 0)).with_duration(duration)
-            black_bar = black_bar.with_position(("center", "top"))
-
-            # 4) 텍스트만 아래로 살짝 내리기
-            x = round((video_width - title_clip.w) / 2)
-
-            text_offset_y = 10  # ↓ 원하는 만큼 조절 (양수면 아래로, 음수면 위로)
-            base_y = round((title_bar_height - title_clip.h) / 2)
-            y = base_y + text_offset_y
-
-            # 바 밖으로 나가지 않도록 클램프
-            y = max(0, min(y, title_bar_height - title_clip.h))
-
-            title_clip = title_clip.with_position((x, y))
-
-            current_segment_clips.append(black_bar)
-            current_segment_clips.append(title_clip)
-
-        segment_clip = CompositeVideoClip(current_segment_clips, size=(video_width, video_height)).with_duration(duration)
-
-        clips.append(segment_clip)
-
-    final_audio = audio
-
-    if bgm_path and os.path.exists(bgm_path):
-        bgm_raw = AudioFileClip(bgm_path)
-        bgm_array = bgm_raw.to_soundarray(fps=44100) * 0.2
-        repeat_count = int(np.ceil(audio.duration / bgm_raw.duration))
-        bgm_array = np.tile(bgm_array, (repeat_count, 1))
-        bgm_array = bgm_array[:int(audio.duration * 44100)]
-
-        bgm = AudioArrayClip(bgm_array, fps=44100).with_duration(audio.duration)
-        final_audio = CompositeAudioClip([audio, bgm])
-
-    final = concatenate_videoclips(clips, method="chain")\
-        .with_audio(final_audio)\
-        .with_fps(24)
-    
-    os.makedirs(os.path.dirname(save_path), exist_ok=True)
-    final.write_videofile(save_path, codec="libx264", audio_codec="aac")
+        for i, seg in enumerate(segments):
+            start = seg['start']
+            # 각 세그먼트의 duration은 해당 세그먼트의 시작 시간과 끝 시간의 차이로 계산합니다.
+            duration = seg['end'] - start
+
+            img_path = image_paths[i]
+
+            # 이미지 하나당 motion clip 생성
+            image_clip = create_motion_clip(img_path, duration, video_width, video_height, motions[i])
+
+            current_segment_clips = [image_clip]
+
+            if title_layer is not None:
+                current_segment_clips.append(title_layer.with_duration(duration).with_position((0, 0)))
+
+            segment_clip = scope.enter_context(
+                CompositeVideoClip(current_segment_clips, size=(video_width, video_height)).with_duration(duration))
+
+            clips.append(segment_clip)
+
+        final = scope.enter_context(concatenate_videoclips(clips, method="chain").with_fps(24))
+
+        write_options = moviepy_write_options(
+            encoder, video_width, video_height,
+            video_filters=[ass_filter(subtitle_path) if subtitle_path else None],
+        )
+
+        os.makedirs(os.path.dirname(save_path), exist_ok=True)
+        mix_dir = scope.enter_context(tempfile.TemporaryDirectory(prefix="bgm_mix_"))
+        final_audio = scope.enter_context(mix_bgm(audio, audio_path, bgm_path, audio.duration, mix_dir))
+        final.with_audio(final_audio).write_videofile(save_path, codec="libx264", audio_codec="aac", **write_options)
     print(f"✅ 타이밍 동기화 영상 저장 완료: {save_path}")
     return save_path
 
 ffmpeg_path = imageio_ffmpeg.get_ffmpeg_exe()
 
+def extra_paths(save_path, output_formats):
+    """output_formats 중 save_path 외에 함께 만들어지는 파일 경로들"""
+    return [path for _, _, path in output_targets(save_path, output_formats)[1:]] if output_formats else []
+
 # ✅ 자막 추가 함수
-def add_subtitles_to_video(input_video_path, ass_path, output_path="assets/video_with_subs.mp4"):
-    fonts_dir = os.path.abspath(os.path.join("assets", "fonts"))
-
-    command = [
-        ffmpeg_path , "-y", "-i", input_video_path,
-        "-vf", f"ass={ass_path}:fontsdir={fonts_dir}",
-        "-c:a", "copy", output_path
-    ]
+def add_subtitles_to_video(input_video_path, ass_path, output_path="assets/video_with_subs.mp4", encoder=None,
+                           cache=False, output_formats=None, hold_static=False):
+    # cache: True면 (입력 영상, 자막, 프로파일)이 같은 이전 결과를 재사용
+    # output_formats: 자막을 한 번 구운 뒤 포맷별 파일로 나눠 인코딩 (입력은 레이아웃 해상도여야 함)
+    # hold_static: 입력이 VFR hold 영상이면 True. 다시 인코딩할 때 -r 24 로 복제 프레임이 되살아나지 않게 VFR 유지
+    def render():
+        return _burn_subtitles(input_video_path, ass_path, output_path, encoder, output_formats, hold_static)
+
+    if cache:
+        parts = {"video": content_id(input_video_path), "ass": content_id(ass_path), "encoder": encoder_id(encoder),
+                 "formats": output_formats, "hold": hold_static}
+        return cached_render("subtitles", parts, output_path, render,
+                             extra_paths(output_path, output_formats)) or output_path
+    return render() or output_path
+
+def _burn_subtitles(input_video_path, ass_path, output_path, encoder, output_formats=None, hold_static=False):
+    if output_formats:
+        # 자막은 레터박스 전에 구워야 위치가 맞으므로 ass -> split -> 포맷별 축소/패딩 순서
+        out_chains, out_args = output_args("subbed", "0:a", output_path, output_formats, None, None, None, encoder,
+                                           video_args=frame_rate_args(hold_static))
+        command = [
+            ffmpeg_path, "-y", "-i", input_video_path,
+            "-filter_complex", ";".join([f"[0:v]{ass_filter(ass_path)}[subbed]"] + out_chains),
+            *out_args,
+        ]
+    else:
+        # 입력이 이미 프로파일 해상도로 인코딩돼 있으면 축소 필터는 사실상 통과
+        video_filters = [ass_filter(ass_path), scale_filter(encoder, None, None)]
+        command = [
+            ffmpeg_path , "-y", "-i", input_video_path,
+            "-vf", ",".join(f for f in video_filters if f),
+            *frame_rate_args(hold_static),
+            *x264_args(encoder),
+            "-c:a", "copy", output_path
+        ]
     try:
         subprocess.run(command, check=True)
         print(f"✅ 자막 포함 영상 저장 완료: {output_path}")
     except subprocess.CalledProcessError as e:
         print("❌ FFmpeg 실행 실패:", e)
+        return None
     return output_path
 
-def create_dark_text_video(script_text, title_text, audio_path=None, bgm_path="", save_path="assets/dark_text_video.mp4"):
+def create_dark_text_video(script_text, title_text, audio_path=None, bgm_path="", save_path="assets/dark_text_video.mp4",
+                           renderer="moviepy", encoder=None, cache=False, output_formats=None, hold_static=False):
+    # cache: True면 입력 내용 해시가 같은 이전 렌더 결과를 재사용 (render_cache)
+    # output_formats, hold_static: create_video_with_segments 와 동일 (정지 화면 경로 전용)
+    def render():
+        return _render_dark_text_video(script_text, title_text, audio_path, bgm_path, save_path, renderer, encoder,
+                                       output_formats, hold_static)
+
+    if not cache:
+        return render()
+    parts = {
+        "script": script_text,
+        "title": title_text,
+        "audio": content_id(audio_path),
+        "bgm": content_id(bgm_path),
+        "renderer": renderer,
+        "encoder": encoder_id(encoder),
+        "formats": output_formats,
+        "hold": hold_static,
+    }
+    return cached_render("dark_text", parts, save_path, render, extra_paths(save_path, output_formats))
+
+def _render_dark_text_video(script_text, title_text, audio_path, bgm_path, save_path, renderer, encoder,
+                            output_formats=None, hold_static=False):
+    # 렌더 중 연 클립은 scope 에 등록해서 성공/실패와 상관없이 끝날 때 닫는다
+    with ExitStack() as scope:
+        return _compose_dark_text_video(scope, script_text, title_text, audio_path, bgm_path, save_path, renderer,
+                                        encoder, output_formats, hold_static)
+
+def _compose_dark_text_video(scope, script_text, title_text, audio_path, bgm_path, save_path, renderer, encoder,
+                             output_formats, hold_static):
+    # renderer="ffmpeg"(또는 ffmpeg_parallel, pipe): 픽셀이 변하지 않는 영상이므로 레이아웃을 PNG 한 장으로 굽고
+    # ffmpeg의 still-image 루프(-tune stillimage)로 인코딩 + 오디오/BGM 먹싱
     video_width, video_height = 720, 1080
     font_path = os.path.abspath(os.path.join("assets", "fonts", "Pretendard-Bold.ttf"))
     if not os.path.exists(font_path):
         raise FileNotFoundError(f"폰트가 없습니다: {font_path}")
 
     if audio_path and os.path.exists(audio_path):
-        audio = AudioFileClip(audio_path)
+        audio = scope.enter_context(AudioFileClip(audio_path))
         duration = audio.duration
     else:
         duration = 2
         audio = AudioArrayClip(np.array([[0.0, 0.0]]), fps=44100).with_duration(duration)
 
-    bg_clip = ColorClip(size=(video_width, video_height), color=(0, 0, 0)).with_duration(duration)
+    # 검은 배경 캔버스 한 장에 제목/본문을 바로 그린다 (텍스트가 변하지 않는 정지 화면)
+    canvas = Image.new("RGB", (video_width, video_height), (0, 0, 0))
+    draw = ImageDraw.Draw(canvas)
 
     # ===== 레이아웃 상수 =====
     TOP_MARGIN = 150
@@ -388,189 +354,115 @@ def create_dark_text_video(script_text, title_text, audio_path=None, bgm_path=""
 
     title_text = ellipsize_two_lines(title_text or "", max_chars_per_line=18)
 
-    # ===== 폭 측정 유틸(래핑/폭 계산만 label로 사용) =====
+    # ===== 폭 측정 유틸(래핑/폭 계산은 text_metrics 캐시 사용) =====
     def line_width(s: str, fs: int) -> int:
-        if not s: return 0
-        c = TextClip(text=s, font=font_path, font_size=fs, method="label")
-        w = c.w
-        c.close()
-        return w
-
-    # 단어 단위 래핑
-    def wrap_to_width(text: str, max_w: int, fs: int):
-        words = text.split()
-        lines, cur = [], ""
-        for w in words:
-            test = (cur + " " + w).strip()
-            if not cur or line_width(test, fs) <= max_w:
-                cur = test
-            else:
-                lines.append(cur); cur = w
-        if cur: lines.append(cur)
-        return lines if lines else [""]
-
-    # 입력 줄바꿈 보존 + 블록별 래핑
-    def wrap_preserving_newlines(text: str, max_w: int, fs: int):
-        out = []
-        for block in (text or "").splitlines():
-            if block.strip() == "":
-                out.append("")              # 빈 줄 유지
-            else:
-                out.extend(wrap_to_width(block, max_w, fs))
-        return out
-
-    # 제목 가운데 맞춤(시각적)
-    def center_label_multiline(raw_text: str, max_w: int, fs: int, pad_char="\u00A0"):
-        blocks = raw_text.split("\n")
-        lines = [b if b.strip() else "" for b in blocks]
-        def _w(s):
-            if not s: return 0
-            c = TextClip(text=s, font=font_path, font_size=fs, method="label")
-            w = c.w; c.close(); return w
-        maxw = max((_w(l) for l in lines), default=0)
-        spacew = max(_w(pad_char), 1)
-        centered = []
-        for l in lines:
-            lw = _w(l)
-            pad = int(round((maxw - lw) / (2 * spacew))) if maxw > lw else 0
-            centered.append(pad_char * pad + l)
-        return "\n".join(centered) + "\n"
-
-    # ===== 제목 =====
+        return text_width(s, font_path, fs)
+
+    # ===== 제목 (가운데 정렬) =====
     title_fontsize = 38
-    max_title_width = CONTENT_WIDTH - 2 * LEFT_BLEED_PAD
-    centered_title_text = center_label_multiline(title_text, max_title_width, title_fontsize)
-    title_clip_tmp = TextClip(
-        text=centered_title_text, font=font_path, font_size=title_fontsize, color="white", method="label"
-    )
-    title_h = title_clip_tmp.h
+    title_layout = layout_lines(title_text.split("\n"), font_path, title_fontsize)
+    title_h = title_layout["height"]
     title_y = TOP_MARGIN
-    title_x = int(SAFE_SIDE_PAD + LEFT_BLEED_PAD + ((CONTENT_WIDTH - 2 * LEFT_BLEED_PAD) - title_clip_tmp.w) / 2)
-    title_clip = title_clip_tmp.with_position((title_x, int(title_y))).with_duration(duration)
+    title_x = int(SAFE_SIDE_PAD + LEFT_BLEED_PAD + ((CONTENT_WIDTH - 2 * LEFT_BLEED_PAD) - title_layout["width"]) / 2)
+    draw_layout(draw, title_layout, title_x, title_y, font_path, title_fontsize, fill="white", align="center")
 
-    # ===== 본문(왼쪽 정렬처럼 보이게 + 하단 잘림 방지) =====
+    # ===== 본문 (왼쪽 정렬, 줄 위치는 폰트 메트릭으로 계산) =====
     GAP_TITLE_BODY = 32
     allowed_body_height = video_height - BOTTOM_MARGIN - (title_y + title_h + GAP_TITLE_BODY) - SAFE_BOTTOM_PAD
 
-    if allowed_body_height <= 0:
-        video = CompositeVideoClip([bg_clip, title_clip], size=(video_width, video_height)).with_duration(duration)
-    else:
+    if allowed_body_height > 0:
         body_fontsize  = 28
         body_width_px  = CONTENT_WIDTH
 
-        LINE_GAP       = int(round(body_fontsize * 0.3))  # 줄 사이 추가 간격
+        BODY_LINE_SPACING = 1.75                           # 글자 줄 간격 (줄 높이 배수)
+        LINE_GAP       = int(round(body_fontsize * 0.3))  # 빈 줄 = 폰트 크기 + LINE_GAP
         TOP_PAD_PX     = int(round(body_fontsize * 0.12))  # 첫 줄 위 여유
         BOTTOM_PAD_PX  = int(round(body_fontsize * 0.25))  # 마지막 줄 아래 여유
-        DESCENDER_EXTRA = 2                                # 각 줄 하단 여유용 보정(px)
 
         MIN_FONT_SIZE   = 14
         MIN_WIDTH_RATIO = 0.60
         min_width_px    = int(CONTENT_WIDTH * MIN_WIDTH_RATIO)
 
         # 좌우 1.5 글자 내부 패딩
-        base_char_w = max(8, line_width("가", body_fontsize), line_width("M", body_fontsize))
-        INNER_PAD = int(round(base_char_w * 1.5))
-
-        NBSP, HAIR = "\u00A0", "\u200A"
-
-        def spacer(h):
-            return ColorClip(size=(1, max(1, int(h))), color=(0, 0, 0)).with_opacity(0)
-
-        def build_body(fs: int, width_px: int):
-            eff_wrap_w = max(20, width_px - 2 * INNER_PAD - 2 * LEFT_BLEED_PAD)
-            lines = wrap_preserving_newlines((script_text or "").rstrip(), eff_wrap_w, fs)
-
-            clips = []
-            y = TOP_PAD_PX
-            maxw = 1
-
-            for i, line in enumerate(lines):
-                if line.strip() == "":
-                    sg = spacer(fs + LINE_GAP)
-                    clips.append(sg.with_position((0, y))); y += sg.h
-                    continue
-
-                # 1) 이 줄의 실제 텍스트 폭을 label로 측정
-                plain_w = line_width(line, fs)
-                # 2) 가운데 정렬을 막기 위해 caption 박스 폭을 "실제 텍스트폭 + 여유"로 설정
-                cap_w = max(plain_w + 6, 10)
-
-                # 3) 하단 잘림 방지를 위해 줄 끝에 "\n\u200A" 추가
-                safe_line = NBSP + line + "\n" + HAIR
-
-                c = TextClip(
-                    text=safe_line,
-                    font=font_path,
-                    font_size=fs,
-                    color="white",
-                    method="label",
-                    size=(cap_w, None),   # 줄 길이만큼만 박스 생성 → 시각적 왼쪽정렬
-                    interline=0
-                )
-                clips.append(c.with_position((0, y)))
-                y += c.h + DESCENDER_EXTRA
-                maxw = max(maxw, c.w)
-
-                if i < len(lines) - 1:
-                    gap = spacer(LINE_GAP)
-                    clips.append(gap.with_position((0, y))); y += gap.h
-
-            total_h = y + BOTTOM_PAD_PX
-            if not clips:
-                return CompositeVideoClip([spacer(int(fs * 1.2)).with_position((0, 0))],
-                                          size=(1, int(fs * 1.2))).with_duration(duration)
-
-            return CompositeVideoClip(clips, size=(maxw, total_h)).with_duration(duration)
-
-        # allowed_body_height에 맞춰 조정
-        fit_clip = None
-        for _ in range(80):
-            body_label = build_body(body_fontsize, body_width_px)
-            if body_label.h <= allowed_body_height:
-                fit_clip = body_label
-                break
-            if body_fontsize > MIN_FONT_SIZE:
-                body_fontsize = max(MIN_FONT_SIZE, body_fontsize - 2)
-                base_char_w = max(8, line_width("가", body_fontsize), line_width("M", body_fontsize))
-                INNER_PAD = int(round(base_char_w * 1.5))
-                continue
-            if body_width_px > min_width_px:
-                body_width_px = max(min_width_px, body_width_px - 10)
-                continue
-            scale = allowed_body_height / float(body_label.h)
-            fit_clip = body_label.resized(scale)
-            break
-
-        if fit_clip is None:
-            fit_clip = build_body(body_fontsize, body_width_px)
-
-        # 좌우 1.5자 패딩 래퍼
-        body_wrapper_w = fit_clip.w + 2 * INNER_PAD
-        body_wrapper_h = fit_clip.h
-        body_wrapper = CompositeVideoClip(
-            [fit_clip.with_position((INNER_PAD, 0))],
-            size=(body_wrapper_w, body_wrapper_h)
-        ).with_duration(duration)
-
-        # 중앙 정렬(래퍼 기준)
-        body_x = int(SAFE_SIDE_PAD + ((CONTENT_WIDTH - body_wrapper.w) / 2))
+        def inner_pad(fs: int) -> int:
+            base_char_w = max(8, line_width("가", fs), line_width("M", fs))
+            return int(round(base_char_w * 1.5))
+
+        def body_layout(fs: int, width_px: int):
+            eff_wrap_w = max(20, width_px - 2 * inner_pad(fs) - 2 * LEFT_BLEED_PAD)
+            lines = wrap_preserving_newlines((script_text or "").rstrip(), eff_wrap_w, font_path, fs)
+            return layout_lines(lines, font_path, fs,
+                                advance=int(round(line_height(font_path, fs) * BODY_LINE_SPACING)),
+                                blank_advance=fs + LINE_GAP)
+
+        def body_height(fs: int, width_px: int) -> int:
+            return TOP_PAD_PX + body_layout(fs, width_px)["height"] + BOTTOM_PAD_PX
+
+        # 후보(큰 값 -> 작은 값) 중 allowed_body_height에 들어가는 가장 큰 값을 이분 탐색
+        def largest_fitting(candidates, height_of):
+            lo, hi, found = 0, len(candidates) - 1, None
+            while lo <= hi:
+                mid = (lo + hi) // 2
+                if height_of(candidates[mid]) <= allowed_body_height:
+                    found, hi = candidates[mid], mid - 1
+                else:
+                    lo = mid + 1
+            return found
+
+        # 1) 폰트 크기(2px 단위)를 먼저 줄여보고, 2) 최소 폰트에서도 안 되면 폭(10px 단위)을 조정
+        font_candidates = list(range(body_fontsize, MIN_FONT_SIZE, -2)) + [MIN_FONT_SIZE]
+        fitted_fs = largest_fitting(font_candidates, lambda fs: body_height(fs, body_width_px))
+        if fitted_fs is not None:
+            body_fontsize = fitted_fs
+        else:
+            body_fontsize = MIN_FONT_SIZE
+            width_candidates = list(range(body_width_px - 10, min_width_px, -10)) + [min_width_px]
+            fitted_w = largest_fitting(width_candidates, lambda w: body_height(MIN_FONT_SIZE, w))
+            body_width_px = fitted_w if fitted_w is not None else min_width_px
+
+        INNER_PAD = inner_pad(body_fontsize)
+        layout = body_layout(body_fontsize, body_width_px)
+        body_h = TOP_PAD_PX + layout["height"] + BOTTOM_PAD_PX
         body_y = int(title_y + title_h + GAP_TITLE_BODY)
-        body_clip = body_wrapper.with_position((body_x, body_y)).with_duration(duration)
-
-        # 하단 투명 패드
-        pad_clip = ColorClip(size=(video_width, SAFE_BOTTOM_PAD), color=(0, 0, 0)).with_opacity(0) \
-                   .with_duration(duration).with_position(("center", video_height - SAFE_BOTTOM_PAD))
-
-        video = CompositeVideoClip([bg_clip, title_clip, body_clip, pad_clip],
-                                   size=(video_width, video_height)).with_duration(duration)
+        if body_h <= allowed_body_height:
+            # 좌우 1.5자 패딩 래퍼를 콘텐츠 영역 가운데에 두고 그 안에 왼쪽 정렬로 그림
+            body_x = int(SAFE_SIDE_PAD + ((CONTENT_WIDTH - (layout["width"] + 2 * INNER_PAD)) / 2))
+            draw_layout(draw, layout, body_x + INNER_PAD, body_y + TOP_PAD_PX, font_path, body_fontsize, fill="white")
+        else:
+            # 최소 폰트/폭으로도 넘치면 본문 블록만 따로 래스터화해서 비율 축소
+            block = Image.fromarray(render_layout(layout, font_path, body_fontsize, fill="white",
+                                                  pad_top=TOP_PAD_PX, pad_bottom=BOTTOM_PAD_PX))
+            scale = allowed_body_height / float(block.height)
+            block = block.resize((max(1, round(block.width * scale)), allowed_body_height), Image.Resampling.LANCZOS)
+            body_x = int(SAFE_SIDE_PAD + ((CONTENT_WIDTH - (block.width + 2 * INNER_PAD)) / 2))
+            canvas.paste(block, (body_x + INNER_PAD, body_y), block)
+
+    frame = np.asarray(canvas)
+
+    # ===== 정지 화면 고속 경로 =====
+    # moviepy라도 output_formats가 있으면 이 경로로 (프레임이 PNG 한 장이라 결과가 같고, 포맷 분기는 ffmpeg에서만 가능)
+    if renderer in ("ffmpeg", "ffmpeg_parallel", "pipe") or (renderer == "moviepy" and output_formats):
+        # 인코딩 동안 오디오 리더를 잡고 있을 필요가 없으므로 바로 닫음 (scope 에서 다시 닫아도 무해)
+        audio.close()
+        render_still_image(
+            frame, duration,
+            audio_path=audio_path if audio_path and os.path.exists(audio_path) else None,
+            bgm_path=bgm_path if bgm_path and os.path.exists(bgm_path) else None,
+            save_path=save_path,
+            encoder=encoder,
+            output_formats=output_formats,
+            hold_static=hold_static,
+        )
+        return save_path
+    elif renderer != "moviepy":
+        raise ValueError(f"Unsupported renderer: {renderer}. Choose 'moviepy', 'ffmpeg', 'ffmpeg_parallel' or 'pipe'.")
 
     # ===== 오디오 & 저장 =====
-    final_audio = audio
-    if bgm_path and os.path.exists(bgm_path):
-        bgm = AudioFileClip(bgm_path).volumex(0.2).with_duration(duration)
-        final_audio = CompositeAudioClip([audio, bgm])
-
-    final_video = video.with_audio(final_audio).with_fps(24)
+    video = scope.enter_context(ImageClip(frame).with_duration(duration))
     os.makedirs(os.path.dirname(save_path), exist_ok=True)
-    final_video.write_videofile(save_path, codec="libx264", audio_codec="aac")
+    mix_dir = scope.enter_context(tempfile.TemporaryDirectory(prefix="bgm_mix_"))
+    final_audio = scope.enter_context(mix_bgm(audio, audio_path, bgm_path, duration, mix_dir))
+    final_video = video.with_audio(final_audio).with_fps(24)
+    final_video.write_videofile(save_path, codec="libx264", audio_codec="aac",
+                                **moviepy_write_options(encoder, video_width, video_height))
     return save_path